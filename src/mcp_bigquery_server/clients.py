@@ -0,0 +1,96 @@
+"""
+Process-wide BigQuery clients shared by every server instance.
+"""
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import google.auth
+from google.cloud import bigquery
+
+try:
+    from google.cloud import bigquery_storage
+except ImportError:
+    bigquery_storage = None
+
+from mcp_bigquery_server.env_utils import (
+    create_authorized_session,
+    load_credentials_from_file,
+    prewarm_credentials,
+)
+
+logger = logging.getLogger("mcp-bigquery-server")
+
+_clients_lock = threading.Lock()
+_clients: Dict[Tuple[Optional[str], Optional[str]], Tuple[bigquery.Client, Optional[Any]]] = {}
+
+def _create_clients(project_id: Optional[str], credentials_path: Optional[str]):
+    """
+    Build a BigQuery client and, when available, a BigQuery Storage read client.
+
+    Args:
+        project_id: Project to bill queries to, or None to use the credentials' project
+        credentials_path: Service account key file, or None for Application Default Credentials
+
+    Returns:
+        Tuple of (bigquery.Client, BigQueryReadClient or None)
+
+    Raises:
+        FileNotFoundError: If credentials_path is set but the file doesn't exist
+    """
+    credentials = None
+    if credentials_path:
+        try:
+            credentials = load_credentials_from_file(credentials_path)
+
+            if not project_id and credentials:
+                project_id = credentials.project_id
+                logger.info("Using project ID from service account: %s", project_id)
+        except FileNotFoundError as e:
+            logger.error("Error loading credentials: %s", e)
+            raise
+
+    if credentials is None:
+        credentials, _ = google.auth.default(scopes=bigquery.Client.SCOPE)
+
+    client = bigquery.Client(
+        project=project_id,
+        credentials=credentials,
+        _http=create_authorized_session(credentials),
+    )
+    prewarm_credentials(client._credentials)
+
+    bqstorage_client = None
+    if bigquery_storage is not None:
+        bqstorage_client = bigquery_storage.BigQueryReadClient(credentials=credentials)
+
+    return client, bqstorage_client
+
+def get_clients(project_id: Optional[str], credentials_path: Optional[str]):
+    """
+    Return the shared clients for a project and credentials file, creating them on first use.
+
+    Credential loading, token minting and HTTP connection setup then happen once
+    per process instead of once per server instance. Creation is serialized by a
+    lock so concurrent callers never build duplicate clients.
+
+    Args:
+        project_id: Project to bill queries to, or None to use the credentials' project
+        credentials_path: Service account key file, or None for Application Default Credentials
+
+    Returns:
+        Tuple of (bigquery.Client, BigQueryReadClient or None); the second item is
+        None when google-cloud-bigquery-storage is not installed
+
+    Raises:
+        FileNotFoundError: If credentials_path is set but the file doesn't exist
+    """
+    key = (project_id, credentials_path)
+    with _clients_lock:
+        clients = _clients.get(key)
+        if clients is None:
+            clients = _create_clients(project_id, credentials_path)
+            _clients[key] = clients
+        else:
+            logger.info("Reusing shared BigQuery client")
+        return clients
@@ -7,10 +7,17 @@ import sys
 import asyncio
 from typing import Any, Dict, Optional
 
+from mcp import types
 from mcp.server import Server
+from mcp.shared.exceptions import McpError
+from pydantic import ValidationError
+from mcp_bigquery_server.utils import dumps_json, loads_json
 
 logger = logging.getLogger("mcp-bigquery-server")
 
+# JSON-RPC error code the MCP specification uses for an unknown resource URI.
+RESOURCE_NOT_FOUND = -32002
+
 def direct_stdio_server(server: Server) -> None:
     """
     Run a direct stdio server implementation that immediately responds to requests.
@@ -37,19 +44,19 @@ def direct_stdio_server(server: Server) -> None:
             
             # Parse the JSON-RPC request
             try:
-                request = json.loads(line)
-                logger.info(f"Received request: {json.dumps(request)}")
+                request = loads_json(line)
+                logger.info("Received request: %s", line)
                 
                 # Handle the request
                 response = handle_request(server, request)
                 
                 # Send the response
                 if response:
-                    response_json = json.dumps(response)
-                    logger.info(f"Sending response: {response_json}")
+                    response_json = dumps_json(response)
+                    logger.info("Sending response: %s", response_json)
                     print(response_json, flush=True)
             except json.JSONDecodeError:
-                logger.error(f"Invalid JSON: {line}")
+                logger.error("Invalid JSON: %s", line)
                 error_response = {
                     "jsonrpc": "2.0",
                     "error": {
@@ -58,9 +65,9 @@ def direct_stdio_server(server: Server) -> None:
                     },
                     "id": None,
                 }
-                print(json.dumps(error_response), flush=True)
+                print(dumps_json(error_response), flush=True)
             except Exception as e:
-                logger.error(f"Error handling request: {e}")
+                logger.error("Error handling request: %s", e)
                 error_response = {
                     "jsonrpc": "2.0",
                     "error": {
@@ -69,11 +76,11 @@ def direct_stdio_server(server: Server) -> None:
                     },
                     "id": None,
                 }
-                print(json.dumps(error_response), flush=True)
+                print(dumps_json(error_response), flush=True)
     except KeyboardInterrupt:
         logger.info("Received keyboard interrupt, exiting...")
     except Exception as e:
-        logger.error(f"Error in stdio server: {e}")
+        logger.error("Error in stdio server: %s", e)
 
 def handle_request(server: Server, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
@@ -83,6 +90,7 @@ def handle_request(server: Server, request: Dict[str, Any]) -> Optional[Dict[str
     - initialize
     - tools/list
     - call_tool
+    - resources/read, when the server registered a resource handler
     """
     method = request.get("method")
     params = request.get("params", {})
@@ -156,7 +164,7 @@ def handle_request(server: Server, request: Dict[str, Any]) -> Optional[Dict[str
                 "id": request_id,
             }
         except Exception as e:
-            logger.error(f"Error calling tool {tool_name}: {e}")
+            logger.error("Error calling tool %s: %s", tool_name, e)
             return {
                 "jsonrpc": "2.0",
                 "error": {
@@ -165,6 +173,8 @@ def handle_request(server: Server, request: Dict[str, Any]) -> Optional[Dict[str
                 },
                 "id": request_id,
             }
+    elif method == "resources/read":
+        return asyncio.run(read_resource(server, params, request_id))
     else:
         # Unknown method
         return {
@@ -175,3 +185,62 @@ def handle_request(server: Server, request: Dict[str, Any]) -> Optional[Dict[str
             },
             "id": request_id,
         }
+
+async def read_resource(server: Server, params: Dict[str, Any], request_id: Any) -> Dict[str, Any]:
+    """
+    Answer a resources/read request with the server's registered resource handler.
+    
+    Text contents are returned as-is and binary contents base64-encoded, as the
+    MCP specification requires. An unknown URI is answered with the error the
+    handler raised, usually RESOURCE_NOT_FOUND.
+    """
+    handler = server.request_handlers.get(types.ReadResourceRequest)
+    if handler is None:
+        return {
+            "jsonrpc": "2.0",
+            "error": {
+                "code": -32601,
+                "message": "Method not found: resources/read",
+            },
+            "id": request_id,
+        }
+    
+    try:
+        request = types.ReadResourceRequest(
+            method="resources/read",
+            params=types.ReadResourceRequestParams.model_validate(params or {}),
+        )
+    except ValidationError as e:
+        return {
+            "jsonrpc": "2.0",
+            "error": {
+                "code": -32602,
+                "message": f"Invalid params: {str(e)}",
+            },
+            "id": request_id,
+        }
+    
+    try:
+        result = await handler(request)
+    except McpError as e:
+        return {
+            "jsonrpc": "2.0",
+            "error": e.error.model_dump(exclude_none=True),
+            "id": request_id,
+        }
+    except Exception as e:
+        logger.error("Error reading resource %s: %s", request.params.uri, e)
+        return {
+            "jsonrpc": "2.0",
+            "error": {
+                "code": -32603,
+                "message": f"Error reading resource {request.params.uri}: {str(e)}",
+            },
+            "id": request_id,
+        }
+    
+    return {
+        "jsonrpc": "2.0",
+        "result": result.root.model_dump(by_alias=True, mode="json", exclude_none=True),
+        "id": request_id,
+    }
@@ -3,10 +3,16 @@ Utility functions for environment variable handling in the BigQuery MCP server.
 """
 import os
 import logging
+from typing import Optional
+import google.auth.transport.requests
+import requests.adapters
 from google.oauth2 import service_account
 
 logger = logging.getLogger("mcp-bigquery-server")
 
+# Per-host connection pools cached by the shared BigQuery HTTP session.
+HTTP_POOL_CONNECTIONS = 32
+
 def get_env_or_default(env_var: str, default=None):
     """
     Get an environment variable value or return a default.
@@ -20,7 +26,7 @@ def get_env_or_default(env_var: str, default=None):
     """
     value = os.environ.get(env_var)
     if value:
-        logger.info(f"Using environment variable {env_var}={value}")
+        logger.info("Using environment variable %s=%s", env_var, value)
     return value or default
 
 def get_project_id_from_env():
@@ -50,6 +56,29 @@ def get_credentials_path_from_env():
     """
     return get_env_or_default("GOOGLE_APPLICATION_CREDENTIALS")
 
+def get_io_threads_from_env() -> int:
+    """
+    Get the number of threads to run blocking BigQuery client calls on.
+    
+    Reads BQ_MCP_THREADS; the default of five threads per CPU (at least 32)
+    suits the network-bound REST calls the client library makes.
+    
+    Returns:
+        Thread count for the blocking I/O executor
+    """
+    default = max(32, (os.cpu_count() or 1) * 5)
+    value = get_env_or_default("BQ_MCP_THREADS")
+    if value is None:
+        return default
+    try:
+        threads = int(value)
+    except ValueError:
+        threads = 0
+    if threads < 1:
+        logger.warning("Ignoring invalid BQ_MCP_THREADS=%s, using %d threads", value, default)
+        return default
+    return threads
+
 def load_credentials_from_file(path: str):
     """
     Load service-account credentials or raise FileNotFoundError.
@@ -72,5 +101,52 @@ def load_credentials_from_file(path: str):
         path,
         scopes=["https://www.googleapis.com/auth/cloud-platform"],
     )
-    logger.info(f"Loaded credentials for service account: {creds.service_account_email}")
+    logger.info("Loaded credentials for service account: %s", creds.service_account_email)
     return creds
+
+def prewarm_credentials(credentials):
+    """
+    Refresh credentials up front so the first BigQuery call doesn't pay for token minting.
+    
+    Failures are logged rather than raised; the client library will retry the
+    refresh on the first request.
+    
+    Args:
+        credentials: Google auth credentials object to refresh
+    """
+    try:
+        credentials.refresh(google.auth.transport.requests.Request())
+        logger.info("Pre-warmed Google Cloud credentials")
+    except Exception as e:
+        logger.warning("Could not pre-warm credentials: %s", e)
+
+def create_authorized_session(
+    credentials,
+    pool_connections: int = HTTP_POOL_CONNECTIONS,
+    pool_maxsize: Optional[int] = None,
+):
+    """
+    Build an authorized HTTP session whose connection pool fits concurrent tool calls.
+    
+    The default requests pool keeps 10 connections per host, so concurrent
+    BigQuery calls beyond that open fresh TLS connections and drop them again.
+    
+    Args:
+        credentials: Google auth credentials used to authorize requests
+        pool_connections: Number of per-host connection pools to cache
+        pool_maxsize: Number of connections to keep open per host; defaults to
+            the blocking I/O thread count, so every worker thread can hold one
+        
+    Returns:
+        AuthorizedSession to pass to bigquery.Client as _http
+    """
+    if pool_maxsize is None:
+        pool_maxsize = get_io_threads_from_env()
+    session = google.auth.transport.requests.AuthorizedSession(credentials)
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=False,
+    )
+    session.mount("https://", adapter)
+    return session
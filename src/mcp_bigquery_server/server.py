@@ -3,30 +3,65 @@ MCP BigQuery Server - A fully-compliant Model Context Protocol server for Google
 Implements MCP specification rev 2025-03-26.
 """
 import argparse
-import json
+import asyncio
+import concurrent.futures
+import contextlib
+import contextvars
+import functools
 import logging
+import operator
 import os
 import re
 import sys
-from typing import Any, Dict, List, Optional, Union
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from google.api_core.exceptions import GoogleAPIError
 from google.cloud import bigquery
+from google.cloud.bigquery.retry import DEFAULT_RETRY
 from mcp import Tool, Resource
 from mcp.server import Server
-from mcp_bigquery_server.direct_stdio import direct_stdio_server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.shared.exceptions import McpError
+from mcp.types import ErrorData
+from mcp_bigquery_server.direct_stdio import (
+    RESOURCE_NOT_FOUND,
+    direct_stdio_server,
+    read_resource,
+)
 from mcp.server.fastmcp import FastMCP
-from mcp_bigquery_server.utils import qualify_information_schema_query
+from mcp_bigquery_server.utils import (
+    bytes_billed_limit,
+    dumps_json,
+    encode_rows_resource,
+    is_cacheable_query,
+    is_ddl_query,
+    is_information_schema_query,
+    is_multi_statement_query,
+    is_read_only_query,
+    qualify_information_schema_query,
+    query_cache_key,
+    rows_to_dicts,
+    schema_field_names,
+    to_query_parameters,
+)
+from mcp_bigquery_server.clients import get_clients
 from mcp_bigquery_server.env_utils import (
     get_project_id_from_env,
     get_location_from_env,
     get_credentials_path_from_env,
-    load_credentials_from_file,
+    get_io_threads_from_env,
 )
 from pydantic import BaseModel, Field
 from sse_starlette.sse import EventSourceResponse
 
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -34,6 +69,87 @@ logging.basicConfig(
 )
 logger = logging.getLogger("mcp-bigquery-server")
 
+# How long a page of a project's dataset listing is served from memory before re-fetching.
+DATASETS_CACHE_TTL_SECONDS = 60
+
+# Number of datasets returned per list_datasets page.
+DATASETS_PAGE_SIZE = 50
+
+# How long a table's get_table_schema payload is served without checking its etag.
+TABLE_CACHE_TTL_SECONDS = 60
+
+# Smallest fetch_results_chunk page worth opening a Storage Read API session for.
+BQSTORAGE_MIN_ROWS = 1000
+
+# How long a repeated read-only execute_query call returns the earlier job instead of submitting again.
+QUERY_CACHE_TTL_SECONDS = 60
+
+# Default time get_job_status waits on BigQuery for a running job to finish.
+JOB_STATUS_WAIT_MS = 10000
+
+# Longest timeoutMs sent with one jobs.getQueryResults call; BigQuery may answer sooner.
+GET_QUERY_RESULTS_MAX_WAIT_MS = 10000
+
+# Pause between jobs.getQueryResults calls that return early, doubling up to the cap.
+JOB_POLL_INITIAL_DELAY_SECONDS = 0.05
+JOB_POLL_MAX_DELAY_SECONDS = 2.0
+
+# How long a running job's get_job_status response is reused; finished jobs never change.
+JOB_STATUS_FRESHNESS_SECONDS = 1.0
+
+# Most rows one execute_query_with_results or fetch_results_chunk call returns;
+# larger maxRows values are clamped so one call cannot materialize a whole table.
+MAX_ROWS_PER_PAGE = 10000
+
+# Approximate cap on the bytes of rows one call returns, so a page of wide
+# STRING, BYTES or JSON columns stops short of MAX_ROWS_PER_PAGE rows.
+MAX_BYTES_PER_PAGE = 16 * 1024 * 1024
+
+# Upper bound on result chunks kept readable through bq://results resources.
+RESULT_RESOURCE_MAX_ENTRIES = 64
+
+# Upper bound on entries in each metadata cache; the oldest entry is evicted first.
+METADATA_CACHE_MAX_ENTRIES = 1024
+
+def _format_dataset(ds: Any) -> Dict[str, Any]:
+    """Build the list_datasets entry for a listed dataset.
+
+    datasets.list reports a dataset's location in the raw resource but not its
+    creation or modification time, so those are always None here.
+    """
+    return {
+        "id": ds.dataset_id,
+        "projectId": ds.project,
+        "location": ds._properties.get("location"),
+        "friendlyName": ds.friendly_name,
+        "labels": ds.labels,
+        "creationTime": None,
+        "lastModifiedTime": None,
+    }
+
+
+def _iso(value: Optional[Any]) -> Optional[str]:
+    """Format a timestamp as ISO 8601, passing None through."""
+    return value.isoformat() if value is not None else None
+
+
+_FIELD_KEYS = ("name", "type", "mode", "description")
+_field_values = operator.attrgetter("name", "field_type", "mode", "description")
+
+
+def _format_field(field: bigquery.SchemaField) -> Dict[str, Any]:
+    """Build the get_table_schema entry for a field, leaving out an empty description."""
+    field_info = dict(zip(_FIELD_KEYS, _field_values(field)))
+    if not field_info["description"]:
+        del field_info["description"]
+    return field_info
+
+
+@functools.lru_cache(maxsize=4096)
+def _table_ref(project_id: str, dataset_id: str, table_id: str) -> bigquery.TableReference:
+    """Return a (memoized) reference to a table, without going through Client.dataset()."""
+    return bigquery.TableReference(bigquery.DatasetReference(project_id, dataset_id), table_id)
+
 
 class BigQueryMCPServer:
     """MCP server implementation for Google BigQuery."""
@@ -47,6 +163,7 @@ class BigQueryMCPServer:
         query_timeout_ms: int = 30000,
         default_project_id: Optional[str] = None,
         default_location: Optional[str] = None,
+        max_bytes_billed: Optional[int] = None,
     ):
         """Initialize the BigQuery MCP server.
 
@@ -58,40 +175,45 @@ class BigQueryMCPServer:
             query_timeout_ms: Timeout for BigQuery queries in milliseconds.
             default_project_id: Default Google Cloud project ID to use.
             default_location: Default BigQuery location/region to use.
+            max_bytes_billed: Cap on bytes billed per query; BigQuery fails
+                queries that would exceed it before running them.
         """
         self.expose_resources = expose_resources
         self.http_enabled = http_enabled
         self.host = host
         self.port = port
         self.query_timeout_ms = query_timeout_ms
+        self.max_bytes_billed = max_bytes_billed
         self.default_project_id = default_project_id or get_project_id_from_env()
         self.default_location = default_location or get_location_from_env()
         self.credentials_path = get_credentials_path_from_env()
         
-        logger.info(f"Using project ID: {self.default_project_id}")
-        logger.info(f"Using location: {self.default_location}")
-        logger.info(f"Using credentials path: {self.credentials_path}")
-        
-        credentials = None
-        if self.credentials_path:
-            try:
-                credentials = load_credentials_from_file(self.credentials_path)
-                
-                if not self.default_project_id and credentials:
-                    self.default_project_id = credentials.project_id
-                    logger.info(f"Using project ID from service account: {self.default_project_id}")
-            except FileNotFoundError as e:
-                logger.error(f"Error loading credentials: {e}")
-                raise
+        logger.info("Using project ID: %s", self.default_project_id)
+        logger.info("Using location: %s", self.default_location)
+        logger.info("Using credentials path: %s", self.credentials_path)
         
-        self.bq_client = bigquery.Client(
-            project=self.default_project_id,
-            credentials=credentials,
+        self.bq_client, self.bqstorage_client = get_clients(
+            self.default_project_id, self.credentials_path
+        )
+        if not self.default_project_id and self.credentials_path:
+            self.default_project_id = self.bq_client.project
+        self._datasets_cache: Dict[tuple, tuple] = {}
+        self._table_cache: Dict[tuple, tuple] = {}
+        self._query_cache: Dict[str, tuple] = {}
+        self._result_resources: Dict[str, list] = {}
+        self._job_states: Dict[str, tuple] = {}
+        # Blocking client calls run here rather than on the loop's default
+        # executor, which is capped at min(32, cpu_count() + 4) threads and is
+        # recreated by every asyncio.run() in the legacy stdio transport.
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=get_io_threads_from_env(), thread_name_prefix="bq-mcp"
         )
+        self._metadata_fetches: Dict[tuple, asyncio.Future] = {}
         
         logger.info(
-            f"BigQuery client initialized for project '{self.bq_client.project}' "
-            f"using service account '{self.bq_client._credentials.service_account_email}'"
+            "BigQuery client initialized for project '%s' using service account '%s'",
+            self.bq_client.project,
+            self.bq_client._credentials.service_account_email,
         )
 
         self.server = Server(
@@ -124,6 +246,8 @@ class BigQueryMCPServer:
                             "additionalProperties": True,
                         },
                         "dryRun": {"type": "boolean"},
+                        "maximumBytesBilled": {"type": "integer", "minimum": 1},
+                        "waitForCompletion": {"type": "boolean"},
                     },
                     "required": ["sql"],
                 },
@@ -142,18 +266,50 @@ class BigQueryMCPServer:
                             "additionalProperties": True,
                         },
                         "dryRun": {"type": "boolean"},
+                        "maximumBytesBilled": {"type": "integer", "minimum": 1},
                         "maxRows": {"type": "integer", "minimum": 1},
                     },
                     "required": ["sql"],
                 },
             ),
+            Tool(
+                name="batch_execute",
+                description="Run several SQL queries concurrently and return all their results",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "projectId": {"type": "string"},
+                        "location": {"type": "string"},
+                        "queries": {
+                            "type": "array",
+                            "minItems": 1,
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "sql": {"type": "string"},
+                                    "params": {
+                                        "type": "object",
+                                        "additionalProperties": True,
+                                    },
+                                    "maxRows": {"type": "integer", "minimum": 1},
+                                    "maximumBytesBilled": {"type": "integer", "minimum": 1},
+                                },
+                                "required": ["sql"],
+                            },
+                        },
+                    },
+                    "required": ["queries"],
+                },
+            ),
             Tool(
                 name="get_job_status",
-                description="Poll job execution state",
+                description="Poll job execution state, waiting server-side up to waitMs for it to finish",
                 inputSchema={
                     "type": "object",
                     "properties": {
                         "jobId": {"type": "string"},
+                        "location": {"type": "string"},
+                        "waitMs": {"type": "integer", "minimum": 0},
                     },
                     "required": ["jobId"],
                 },
@@ -165,6 +321,8 @@ class BigQueryMCPServer:
                     "type": "object",
                     "properties": {
                         "jobId": {"type": "string"},
+                        "projectId": {"type": "string"},
+                        "location": {"type": "string"},
                     },
                     "required": ["jobId"],
                 },
@@ -178,6 +336,8 @@ class BigQueryMCPServer:
                         "jobId": {"type": "string"},
                         "offset": {"type": "integer", "minimum": 0},
                         "maxRows": {"type": "integer", "minimum": 1},
+                        "waitMs": {"type": "integer", "minimum": 0},
+                        "useStorageApi": {"type": "boolean"},
                     },
                     "required": ["jobId"],
                 },
@@ -209,6 +369,11 @@ class BigQueryMCPServer:
         ]
 
         self.tools = {tool.name: tool for tool in tools}
+        self._validators = {}
+        if fastjsonschema is not None:
+            self._validators = {
+                tool.name: fastjsonschema.compile(tool.inputSchema) for tool in tools
+            }
         
         async def handle_tool_call(tool_name, params):
             handler = self._get_tool_handler(tool_name)
@@ -217,10 +382,18 @@ class BigQueryMCPServer:
             return {"error": f"Unknown tool: {tool_name}"}
         
         self.server.call_tool = handle_tool_call
+        
+        if self.expose_resources:
+            self.server.read_resource()(self._handle_read_resource)
 
     def _create_fastapi_app(self) -> FastAPI:
         """Create a FastAPI app for HTTP transport."""
-        app = FastAPI(title="MCP BigQuery Server")
+        @contextlib.asynccontextmanager
+        async def lifespan(app: FastAPI):
+            yield
+            self._executor.shutdown(wait=False)
+
+        app = FastAPI(title="MCP BigQuery Server", lifespan=lifespan)
 
         app.add_middleware(
             CORSMiddleware,
@@ -239,7 +412,7 @@ class BigQueryMCPServer:
             origin = request.headers.get("origin")
             if origin and not self._is_valid_origin(origin):
                 return Response(
-                    content=json.dumps({
+                    content=dumps_json({
                         "jsonrpc": "2.0",
                         "error": {
                             "code": -32000,
@@ -258,50 +431,10 @@ class BigQueryMCPServer:
                 )
             
             body = await request.json()
-            if body.get("method") == "call_tool":
-                tool_name = body.get("params", {}).get("tool")
-                tool_params = body.get("params", {}).get("params", {})
-                
-                handler = self._get_tool_handler(tool_name)
-                if handler:
-                    try:
-                        result = await handler(tool_params)
-                        response = {
-                            "jsonrpc": "2.0",
-                            "result": result,
-                            "id": body.get("id")
-                        }
-                    except Exception as e:
-                        logger.error(f"Error handling tool call: {e}")
-                        response = {
-                            "jsonrpc": "2.0",
-                            "error": {
-                                "code": -32000,
-                                "message": str(e)
-                            },
-                            "id": body.get("id")
-                        }
-                else:
-                    response = {
-                        "jsonrpc": "2.0",
-                        "error": {
-                            "code": -32601,
-                            "message": f"Tool not found: {tool_name}"
-                        },
-                        "id": body.get("id")
-                    }
-            else:
-                response = {
-                    "jsonrpc": "2.0",
-                    "error": {
-                        "code": -32601,
-                        "message": f"Method not found: {body.get('method')}"
-                    },
-                    "id": body.get("id")
-                }
+            response = await self._handle_jsonrpc(body)
                 
             return Response(
-                content=json.dumps(response),
+                content=dumps_json(response),
                 media_type="application/json",
             )
 
@@ -309,7 +442,7 @@ class BigQueryMCPServer:
         async def handle_mcp_get(request: Request) -> Response:
             """Handle MCP GET requests."""
             return Response(
-                content=json.dumps({
+                content=dumps_json({
                     "status": "ok",
                     "server": "mcp-bigquery-server",
                     "version": "1.0.0",
@@ -322,8 +455,55 @@ class BigQueryMCPServer:
     async def _stream_response(self, request: Request):
         """Stream responses for SSE."""
         body = await request.json()
-        async for response in self.server.handle_jsonrpc_stream(body):
-            yield {"data": json.dumps(response)}
+        response = await self._handle_jsonrpc(body)
+        yield {"data": dumps_json(response)}
+
+    async def _handle_jsonrpc(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch one JSON-RPC request received over HTTP and build its response."""
+        if body.get("method") == "call_tool":
+            tool_name = body.get("params", {}).get("tool")
+            tool_params = body.get("params", {}).get("params", {})
+            
+            handler = self._get_tool_handler(tool_name)
+            if handler:
+                try:
+                    result = await handler(tool_params)
+                    response = {
+                        "jsonrpc": "2.0",
+                        "result": result,
+                        "id": body.get("id")
+                    }
+                except Exception as e:
+                    logger.error("Error handling tool call: %s", e)
+                    response = {
+                        "jsonrpc": "2.0",
+                        "error": {
+                            "code": -32000,
+                            "message": str(e)
+                        },
+                        "id": body.get("id")
+                    }
+            else:
+                response = {
+                    "jsonrpc": "2.0",
+                    "error": {
+                        "code": -32601,
+                        "message": f"Tool not found: {tool_name}"
+                    },
+                    "id": body.get("id")
+                }
+        elif body.get("method") == "resources/read":
+            response = await read_resource(self.server, body.get("params", {}), body.get("id"))
+        else:
+            response = {
+                "jsonrpc": "2.0",
+                "error": {
+                    "code": -32601,
+                    "message": f"Method not found: {body.get('method')}"
+                },
+                "id": body.get("id")
+            }
+        return response
 
     def _is_valid_origin(self, origin: str) -> bool:
         """Validate the origin header for security."""
@@ -340,13 +520,27 @@ class BigQueryMCPServer:
         handlers = {
             "execute_query": self._handle_execute_query,
             "execute_query_with_results": self._handle_execute_query_with_results,
+            "batch_execute": self._handle_batch_execute,
             "get_job_status": self._handle_get_job_status,
             "cancel_job": self._handle_cancel_job,
             "fetch_results_chunk": self._handle_fetch_results_chunk,
             "list_datasets": self._handle_list_datasets,
             "get_table_schema": self._handle_get_table_schema,
         }
-        return handlers.get(tool_name)
+        handler = handlers.get(tool_name)
+        validate = self._validators.get(tool_name)
+        if handler and validate:
+            return functools.partial(self._validated_call, validate, handler)
+        return handler
+
+    @staticmethod
+    async def _validated_call(validate, handler, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Check params against the tool's compiled input schema before running its handler."""
+        try:
+            validate(params)
+        except fastjsonschema.JsonSchemaValueException as e:
+            raise ValueError(f"Invalid arguments: {e.message}")
+        return await handler(params)
 
     async def _handle_execute_query(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle execute_query tool."""
@@ -356,43 +550,57 @@ class BigQueryMCPServer:
             location = params.get("location")
             query_params = params.get("params", {})
             dry_run = params.get("dryRun", False)
+            wait_for_completion = params.get("waitForCompletion", False)
 
             region_specific = False
             region_location = None
             
-            if "INFORMATION_SCHEMA" in sql.upper():
+            if is_information_schema_query(sql):
                 region_match = re.search(r'FROM\s+`?region-([a-z0-9-]+)`?\.INFORMATION_SCHEMA', sql, re.IGNORECASE)
                 if region_match:
                     region_specific = True
                     region_code = region_match.group(1)
                     region_location = region_code.upper()
-                    logger.info(f"Detected region-specific query for region: {region_code}, using location: {region_location}")
+                    logger.info("Detected region-specific query for region: %s, using location: %s", region_code, region_location)
                 
-                logger.info(f"Transforming INFORMATION_SCHEMA query: {sql}")
+                logger.info("Transforming INFORMATION_SCHEMA query: %s", sql)
                 sql = qualify_information_schema_query(sql, project_id)
-                logger.info(f"Transformed query: {sql}")
+                logger.info("Transformed query: %s", sql)
 
             if region_specific and region_location:
-                logger.info(f"Using region-specific location: {region_location}")
+                logger.info("Using region-specific location: %s", region_location)
                 location = region_location
             
+            cache_key = None
+            if not dry_run and is_cacheable_query(sql):
+                cache_key = query_cache_key(sql, query_params, project_id, location)
+                cached = await self._cached_query_submission(cache_key, wait_for_completion)
+                if cached is not None:
+                    return cached
+            
             job_config = bigquery.QueryJobConfig(
                 dry_run=dry_run,
                 use_query_cache=True,
             )
 
             if query_params:
-                pass
+                job_config.query_parameters = to_query_parameters(query_params)
+            
+            maximum_bytes_billed = bytes_billed_limit(
+                self.max_bytes_billed, params.get("maximumBytesBilled")
+            )
+            if maximum_bytes_billed is not None and not dry_run:
+                job_config.maximum_bytes_billed = maximum_bytes_billed
 
-            query_job = self.bq_client.query(
+            query_job = await self._run_blocking(
+                self.bq_client.query,
                 sql,
                 job_config=job_config,
                 project=project_id,
                 location=location,
             )
 
-            query_job.result(timeout=self.query_timeout_ms / 1000)
-
+            # Dry-run jobs are complete as soon as query() returns.
             if dry_run:
                 return {
                     "bytesProcessed": query_job.total_bytes_processed,
@@ -400,16 +608,30 @@ class BigQueryMCPServer:
                     "projectId": project_id,
                     "location": location
                 }
-            else:
-                return {
-                    "jobId": query_job.job_id,
-                    "status": query_job.state,
-                    "bytesProcessed": query_job.total_bytes_processed,
-                    "projectId": project_id,
-                    "location": location
-                }
+
+            # query() has already submitted the job; callers poll get_job_status
+            # unless they ask to block until it finishes.
+            if wait_for_completion:
+                await self._run_blocking(query_job.result, timeout=self.query_timeout_ms / 1000)
+            self._invalidate_caches_after(sql)
+
+            response = {
+                "jobId": query_job.job_id,
+                "status": query_job.state,
+                "bytesProcessed": query_job.total_bytes_processed,
+                "projectId": project_id,
+                "location": location
+            }
+            self._record_job_state(query_job.job_id, query_job.state)
+            # A job that already failed is never handed out again; one still
+            # running is re-checked before it is reused.
+            if cache_key is not None and not query_job.error_result:
+                self._cache_put(self._query_cache, cache_key, (time.monotonic(), response))
+            return response
         except Exception as e:
-            logger.error(f"Error executing query: {e}")
+            logger.error("Error executing query: %s", e)
+            raise Exception(f"BigQuery error: {str(e)}")
+
     async def _handle_execute_query_with_results(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle execute_query_with_results tool."""
         try:
@@ -418,25 +640,25 @@ class BigQueryMCPServer:
             location = params.get("location")
             query_params = params.get("params", {})
             dry_run = params.get("dryRun", False)
-            max_rows = params.get("maxRows", 100)
+            max_rows = min(params.get("maxRows", 100), MAX_ROWS_PER_PAGE)
 
             region_specific = False
             region_location = None
             
-            if "INFORMATION_SCHEMA" in sql.upper():
+            if is_information_schema_query(sql):
                 region_match = re.search(r'FROM\s+`?region-([a-z0-9-]+)`?\.INFORMATION_SCHEMA', sql, re.IGNORECASE)
                 if region_match:
                     region_specific = True
                     region_code = region_match.group(1)
                     region_location = region_code.upper()
-                    logger.info(f"Detected region-specific query for region: {region_code}, using location: {region_location}")
+                    logger.info("Detected region-specific query for region: %s, using location: %s", region_code, region_location)
                 
-                logger.info(f"Transforming INFORMATION_SCHEMA query: {sql}")
+                logger.info("Transforming INFORMATION_SCHEMA query: %s", sql)
                 sql = qualify_information_schema_query(sql, project_id)
-                logger.info(f"Transformed query: {sql}")
+                logger.info("Transformed query: %s", sql)
 
             if region_specific and region_location:
-                logger.info(f"Using region-specific location: {region_location}")
+                logger.info("Using region-specific location: %s", region_location)
                 location = region_location
             
             job_config = bigquery.QueryJobConfig(
@@ -445,17 +667,22 @@ class BigQueryMCPServer:
             )
 
             if query_params:
-                pass
-
-            query_job = self.bq_client.query(
-                sql,
-                job_config=job_config,
-                project=project_id,
-                location=location,
+                job_config.query_parameters = to_query_parameters(query_params)
+            
+            maximum_bytes_billed = bytes_billed_limit(
+                self.max_bytes_billed, params.get("maximumBytesBilled")
             )
+            if maximum_bytes_billed is not None and not dry_run:
+                job_config.maximum_bytes_billed = maximum_bytes_billed
 
             if dry_run:
-                query_job.result(timeout=self.query_timeout_ms / 1000)
+                query_job = await self._run_blocking(
+                    self.bq_client.query,
+                    sql,
+                    job_config=job_config,
+                    project=project_id,
+                    location=location,
+                )
                 return {
                     "bytesProcessed": query_job.total_bytes_processed,
                     "isDryRun": True,
@@ -463,79 +690,174 @@ class BigQueryMCPServer:
                     "location": location
                 }
             
-            results = query_job.result(timeout=self.query_timeout_ms / 1000)
-            schema = [field.name for field in results.schema]
-            
-            rows = []
-            for i, row in enumerate(results):
-                if i >= max_rows:
-                    break
-                rows.append({field: value for field, value in zip(schema, row.values())})
-            
-            has_more = len(rows) == max_rows
-            
             if self.expose_resources:
-                resource_uri = f"bq://results/{query_job.job_id}/0"
+                # Rows are served through the resource URI, so only wait for the
+                # job to finish and read its schema and row count; max_results=0
+                # keeps jobs.getQueryResults from returning a page of rows.
+                query_job = await self._run_blocking(
+                    self.bq_client.query,
+                    sql,
+                    job_config=job_config,
+                    project=project_id,
+                    location=location,
+                )
+                results = await self._run_blocking(
+                    query_job.result,
+                    timeout=self.query_timeout_ms / 1000,
+                    max_results=0,
+                )
+                self._invalidate_caches_after(sql)
+                self._record_job_state(query_job.job_id, query_job.state)
+                schema = schema_field_names(results.schema)
+                total_rows = results.total_rows or 0
+                row_count = min(total_rows, max_rows)
+                has_more = total_rows > max_rows
                 
                 return {
                     "jobId": query_job.job_id,
                     "status": query_job.state,
                     "bytesProcessed": query_job.total_bytes_processed,
-                    "rowCount": len(rows),
+                    "rowCount": row_count,
+                    "totalRows": total_rows,
                     "schema": schema,
                     "hasMore": has_more,
-                    "nextOffset": len(rows) if has_more else None,
+                    "nextOffset": row_count if has_more else None,
                     "results": {
                         "type": "resource",
-                        "uri": resource_uri,
+                        "uri": self._add_result_resource(query_job.job_id, 0, row_count),
                     },
                     "projectId": project_id,
                     "location": location
                 }
-            else:
-                return {
-                    "jobId": query_job.job_id,
-                    "status": query_job.state,
-                    "bytesProcessed": query_job.total_bytes_processed,
-                    "rowCount": len(rows),
-                    "schema": schema,
-                    "hasMore": has_more,
-                    "nextOffset": len(rows) if has_more else None,
-                    "results": rows,
-                    "projectId": project_id,
-                    "location": location
-                }
+            
+            # jobs.query returns the first page of rows in the initial response,
+            # saving the jobs.insert + jobs.getQueryResults round-trips.
+            results = await self._run_blocking(
+                self.bq_client.query_and_wait,
+                sql,
+                job_config=job_config,
+                project=project_id,
+                location=location,
+                wait_timeout=self.query_timeout_ms / 1000,
+                max_results=max_rows,
+            )
+            self._invalidate_caches_after(sql)
+            self._record_job_state(results.job_id, "DONE")
+            schema = schema_field_names(results.schema)
+            
+            rows = await self._run_blocking(
+                rows_to_dicts, results, max_rows, max_bytes=MAX_BYTES_PER_PAGE
+            )
+            
+            total_rows = results.total_rows
+            has_more = len(rows) == max_rows if total_rows is None else len(rows) < total_rows
+            
+            return {
+                "jobId": results.job_id,
+                "status": "DONE",
+                "bytesProcessed": results.total_bytes_processed,
+                "rowCount": len(rows),
+                "totalRows": total_rows,
+                "schema": schema,
+                "hasMore": has_more,
+                "nextOffset": len(rows) if has_more else None,
+                "results": rows,
+                "projectId": project_id,
+                "location": location
+            }
         except Exception as e:
-            logger.error(f"Error executing query with results: {e}")
+            logger.error("Error executing query with results: %s", e)
             raise Exception(f"BigQuery error: {str(e)}")
 
+    async def _handle_batch_execute(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle batch_execute tool by running each query concurrently."""
+        try:
+            defaults = {
+                "projectId": params.get("projectId"),
+                "location": params.get("location"),
+            }
+            queries = params["queries"]
+            
+            outcomes = await asyncio.gather(
+                *(
+                    self._handle_execute_query_with_results({**defaults, **query})
+                    for query in queries
+                ),
+                return_exceptions=True,
+            )
+            
+            return {
+                "results": [
+                    {"error": str(outcome)} if isinstance(outcome, Exception) else outcome
+                    for outcome in outcomes
+                ],
+            }
+        except Exception as e:
+            logger.error("Error executing query batch: %s", e)
             raise Exception(f"BigQuery error: {str(e)}")
 
     async def _handle_get_job_status(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle get_job_status tool."""
         try:
             job_id = params["jobId"]
-            job = self.bq_client.get_job(job_id)
+            location = params.get("location")
+            wait_ms = min(params.get("waitMs", JOB_STATUS_WAIT_MS), self.query_timeout_ms)
             
-            return {
+            # A finished job's status never changes, and a running job's is
+            # reused briefly so tight polling loops don't each cost a jobs.get.
+            known = self._job_states.get(job_id)
+            if known is not None and known[2] is not None and (
+                known[1] == "DONE"
+                or time.monotonic() - known[0] < JOB_STATUS_FRESHNESS_SECONDS
+            ):
+                return known[2]
+            
+            if wait_ms > 0 and (known is None or known[1] != "DONE"):
+                await self._wait_for_job(job_id, wait_ms, location)
+            
+            job = await self._run_blocking(self.bq_client.get_job, job_id, location=location)
+            
+            status = {
                 "jobId": job.job_id,
                 "status": job.state,
                 "bytesProcessed": job.total_bytes_processed,
-                "creationTime": job.created.isoformat(),
-                "startTime": job.started.isoformat() if job.started else None,
-                "endTime": job.ended.isoformat() if job.ended else None,
+                "creationTime": _iso(job.created),
+                "startTime": _iso(job.started),
+                "endTime": _iso(job.ended),
                 "error": job.error_result,
             }
+            self._record_job_state(job_id, job.state, status)
+            return status
         except Exception as e:
-            logger.error(f"Error getting job status: {e}")
+            logger.error("Error getting job status: %s", e)
             raise Exception(f"BigQuery error: {str(e)}")
 
     async def _handle_cancel_job(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle cancel_job tool."""
         try:
             job_id = params["jobId"]
-            job = self.bq_client.get_job(job_id)
-            job.cancel()
+            location = params.get("location")
+            
+            # Cancelling a job already seen to finish would be a no-op RPC.
+            known = self._job_states.get(job_id)
+            if known is not None and known[1] == "DONE":
+                return {
+                    "jobId": job_id,
+                    "status": "DONE",
+                    "success": False,
+                    "message": "Job has already finished",
+                }
+            
+            # jobs.cancel identifies the job by ID alone, so there is no need
+            # to fetch it with get_job first.
+            job = await self._run_blocking(
+                self.bq_client.cancel_job,
+                job_id,
+                project=params.get("projectId"),
+                location=location,
+            )
+            # The job is now winding down, so its next status must be fetched.
+            self._job_states.pop(job_id, None)
             
             return {
                 "jobId": job.job_id,
@@ -543,7 +865,7 @@ class BigQueryMCPServer:
                 "success": True,
             }
         except Exception as e:
-            logger.error(f"Error cancelling job: {e}")
+            logger.error("Error cancelling job: %s", e)
             raise Exception(f"BigQuery error: {str(e)}")
 
     async def _handle_fetch_results_chunk(self, params: Dict[str, Any]) -> Dict[str, Any]:
@@ -551,9 +873,18 @@ class BigQueryMCPServer:
         try:
             job_id = params["jobId"]
             offset = params.get("offset", 0)
-            max_rows = params.get("maxRows", 100)
+            max_rows = min(params.get("maxRows", 100), MAX_ROWS_PER_PAGE)
+            wait_ms = min(params.get("waitMs", self.query_timeout_ms), self.query_timeout_ms)
             
-            job = self.bq_client.get_job(job_id)
+            job = await self._run_blocking(self.bq_client.get_job, job_id)
+            
+            if job.state != "DONE" and wait_ms > 0:
+                # Wait here so a caller gets the rows in this call whenever the
+                # job finishes within waitMs, instead of polling for it.
+                if await self._wait_for_job(job_id, wait_ms, job.location):
+                    job = await self._run_blocking(
+                        self.bq_client.get_job, job_id, location=job.location
+                    )
             
             if job.state != "DONE":
                 return {
@@ -565,91 +896,331 @@ class BigQueryMCPServer:
             if job.error_result:
                 raise Exception(f"Query failed: {job.error_result}")
             
-            results = job.result(start_index=offset, max_results=max_rows)
-            schema = [field.name for field in results.schema]
-            
-            rows = []
-            for row in results:
-                rows.append({field: value for field, value in zip(schema, row.values())})
-            
-            has_more = len(rows) == max_rows
-            
             if self.expose_resources:
-                resource_uri = f"bq://results/{job_id}/{offset}"
-                pass
+                # Rows are encoded only when the resource is read, so just read
+                # the row count here; max_results=0 returns no rows.
+                results = await self._run_blocking(
+                    job.result, start_index=offset, max_results=0
+                )
+                total_rows = results.total_rows or 0
+                row_count = max(0, min(max_rows, total_rows - offset))
+                has_more = offset + row_count < total_rows
                 
+                # The column names were already returned with the query that
+                # produced this job, so they are not repeated for each chunk.
                 return {
                     "jobId": job_id,
                     "offset": offset,
-                    "rowCount": len(rows),
-                    "schema": schema,
+                    "rowCount": row_count,
+                    "totalRows": total_rows,
+                    "schema": None,
                     "hasMore": has_more,
-                    "nextOffset": offset + len(rows) if has_more else None,
+                    "nextOffset": offset + row_count if has_more else None,
                     "results": {
                         "type": "resource",
-                        "uri": resource_uri,
+                        "uri": self._add_result_resource(job_id, offset, row_count),
                     }
                 }
-            else:
-                return {
-                    "jobId": job_id,
-                    "offset": offset,
-                    "rowCount": len(rows),
-                    "schema": schema,
-                    "hasMore": has_more,
-                    "nextOffset": offset + len(rows) if has_more else None,
-                    "results": rows,
-                }
+            
+            results, bqstorage_client = await self._chunk_results(
+                job, offset, max_rows, params.get("useStorageApi")
+            )
+            rows = await self._run_blocking(
+                rows_to_dicts, results, max_rows, bqstorage_client, max_bytes=MAX_BYTES_PER_PAGE
+            )
+            
+            # total_rows arrives with the first page, so it tells exactly whether
+            # rows remain past this chunk; it is None only for statements that
+            # produce no result table.
+            total_rows = results.total_rows
+            end = offset + len(rows)
+            has_more = len(rows) == max_rows if total_rows is None else end < total_rows
+            
+            return {
+                "jobId": job_id,
+                "offset": offset,
+                "rowCount": len(rows),
+                "totalRows": total_rows,
+                "schema": schema_field_names(results.schema),
+                "hasMore": has_more,
+                "nextOffset": end if has_more else None,
+                "results": rows,
+            }
         except Exception as e:
-            logger.error(f"Error fetching results: {e}")
+            logger.error("Error fetching results: %s", e)
             raise Exception(f"BigQuery error: {str(e)}")
 
+    async def _wait_for_job(self, job_id: str, wait_ms: int, location: Optional[str] = None) -> bool:
+        """Wait up to wait_ms for a query job to finish.
+
+        jobs.getQueryResults holds each request open on BigQuery's side until
+        the job completes or its timeoutMs passes, the same wait
+        QueryJob.result() relies on, so no time is spent sleeping client-side
+        except after a call that returned early. It also fails for a job that
+        failed and for jobs that are not queries; such a job is looked up and
+        counts as finished if it is DONE, so the caller's get_job reports its
+        error_result. Any other API error is raised.
+
+        Returns:
+            True if the job finished within wait_ms
+        """
+        deadline = time.monotonic() + wait_ms / 1000
+        delay = JOB_POLL_INITIAL_DELAY_SECONDS
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                query_results = await self._run_blocking(
+                    self.bq_client._get_query_results,
+                    job_id,
+                    DEFAULT_RETRY,
+                    timeout_ms=min(GET_QUERY_RESULTS_MAX_WAIT_MS, int(remaining * 1000)),
+                    location=location,
+                )
+            except GoogleAPIError:
+                job = await self._run_blocking(self.bq_client.get_job, job_id, location=location)
+                if job.state == "DONE":
+                    return True
+                raise
+            if query_results.complete:
+                return True
+            await asyncio.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+            delay = min(delay * 2, JOB_POLL_MAX_DELAY_SECONDS)
+
+    async def _chunk_results(
+        self, job, offset: int, max_rows: int, use_storage_api: Optional[bool] = None
+    ):
+        """Open a RowIterator over one chunk of a finished job's results.
+
+        Args:
+            use_storage_api: True or False to force or rule out the Storage Read
+                API where it can be used, or None to decide from the chunk size
+
+        Returns:
+            Tuple of (RowIterator, BigQueryReadClient or None to read it over REST)
+        """
+        if use_storage_api is None:
+            use_storage_api = max_rows >= BQSTORAGE_MIN_ROWS and not job.cache_hit
+        use_bqstorage = (
+            self.bqstorage_client is not None
+            and offset == 0
+            and use_storage_api
+        )
+        if use_bqstorage:
+            # The Storage Read API streams the whole result table and cannot
+            # start at an offset or stop at max_results, so it only serves the
+            # first chunk; callers stop reading once max_rows arrive.
+            # Small pages and cached results come back faster over REST than
+            # it takes to open a read session.
+            results = await self._run_blocking(job.result)
+            return results, self.bqstorage_client
+        results = await self._run_blocking(
+            job.result, start_index=offset, max_results=max_rows
+        )
+        return results, None
+
+    def _add_result_resource(self, job_id: str, offset: int, row_count: int) -> str:
+        """Make a chunk of a job's results readable as a resource and return its URI."""
+        uri = f"bq://results/{job_id}/{offset}"
+        entry = self._result_resources.get(uri)
+        if entry is None or entry[2] != row_count:
+            if uri not in self._result_resources and len(self._result_resources) >= RESULT_RESOURCE_MAX_ENTRIES:
+                del self._result_resources[next(iter(self._result_resources))]
+            # [job ID, offset, row count, encoded contents once read]
+            self._result_resources[uri] = [job_id, offset, row_count, None]
+        return uri
+
+    async def _handle_read_resource(self, uri) -> List[ReadResourceContents]:
+        """Serve a bq://results chunk, encoding it on first read.
+
+        Chunks are sent as an Arrow IPC stream when pyarrow is installed and as
+        JSON otherwise, without building row dicts in the Arrow case.
+        """
+        entry = self._result_resources.get(str(uri))
+        if entry is None:
+            # Never handed out, or evicted to make room for newer chunks.
+            raise McpError(ErrorData(
+                code=RESOURCE_NOT_FOUND,
+                message=f"Resource not found: {uri}",
+                data={"uri": str(uri)},
+            ))
+        
+        job_id, offset, row_count, contents = entry
+        if contents is None:
+            job = await self._run_blocking(self.bq_client.get_job, job_id)
+            results, bqstorage_client = await self._chunk_results(job, offset, row_count)
+            contents = await self._run_blocking(
+                encode_rows_resource, results, row_count, bqstorage_client
+            )
+            entry[3] = contents
+        
+        content, mime_type = contents
+        return [ReadResourceContents(content=content, mime_type=mime_type)]
+
+    def _record_job_state(
+        self, job_id: str, state: str, status: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Remember the last observed state of a job, and its get_job_status response if known."""
+        self._cache_put(self._job_states, job_id, (time.monotonic(), state, status))
+
+    def _invalidate_metadata_cache(self) -> None:
+        """Drop cached dataset listings and table metadata after a DDL statement."""
+        self._datasets_cache.clear()
+        self._table_cache.clear()
+
+    def _invalidate_caches_after(self, sql: str) -> None:
+        """Drop cached state a statement may have made stale.
+
+        DML and DDL can change what an earlier SELECT would return, so any
+        statement that isn't read-only clears the reused query jobs; DDL and
+        multi-statement scripts also clear dataset and table metadata.
+        """
+        if is_read_only_query(sql):
+            return
+        self._query_cache.clear()
+        # A script's later statements may be DDL even when its first isn't.
+        if is_ddl_query(sql) or is_multi_statement_query(sql):
+            self._invalidate_metadata_cache()
+
+    async def _cached_query_submission(
+        self, cache_key: str, wait_for_completion: bool
+    ) -> Optional[Dict[str, Any]]:
+        """Return the response of an identical execute_query call made within the TTL, if any.
+
+        A job that hadn't finished when it was cached is looked up again first:
+        if it has failed since, or can't be looked up, the entry is dropped so
+        the query is submitted afresh. A job still running is not reused for a
+        caller asking to wait for completion.
+        """
+        cached = self._query_cache.get(cache_key)
+        if cached is None or time.monotonic() - cached[0] >= QUERY_CACHE_TTL_SECONDS:
+            return None
+        response = cached[1]
+        if response["status"] != "DONE":
+            try:
+                job = await self._run_blocking(
+                    self.bq_client.get_job,
+                    response["jobId"],
+                    project=response["projectId"],
+                    location=response["location"],
+                )
+            except Exception as e:
+                logger.warning("Could not re-check cached job %s: %s", response["jobId"], e)
+                job = None
+            # A DML or DDL statement may have cleared the entry meanwhile.
+            if self._query_cache.get(cache_key) is not cached:
+                return None
+            if job is None or job.error_result:
+                del self._query_cache[cache_key]
+                return None
+            response = {**response, "status": job.state, "bytesProcessed": job.total_bytes_processed}
+            self._query_cache[cache_key] = (cached[0], response)
+        if wait_for_completion and response["status"] != "DONE":
+            return None
+        logger.info("Reusing job %s for repeated query", response["jobId"])
+        return response
+
+    @staticmethod
+    def _cache_put(cache: Dict[Any, tuple], key: Any, entry: tuple) -> None:
+        """Store a cache entry, evicting the oldest one once the cache is full."""
+        if key not in cache and len(cache) >= METADATA_CACHE_MAX_ENTRIES:
+            del cache[next(iter(cache))]
+        cache[key] = entry
+
+    def _run_blocking(self, func, *args, **kwargs) -> asyncio.Future:
+        """Run a blocking BigQuery client call on the server's I/O executor.
+
+        Like asyncio.to_thread, the call runs in a copy of the caller's
+        context, so context variables set by the request stay visible.
+        """
+        return asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            functools.partial(contextvars.copy_context().run, func, *args, **kwargs),
+        )
+
+    async def _fetch_once(self, key: tuple, func, *args):
+        """Run a blocking metadata fetch in a thread, sharing it between concurrent callers."""
+        pending = self._metadata_fetches.get(key)
+        if pending is None:
+            pending = self._run_blocking(func, *args)
+            self._metadata_fetches[key] = pending
+            pending.add_done_callback(lambda _: self._metadata_fetches.pop(key, None))
+        return await asyncio.shield(pending)
+
+    def _fetch_datasets_page(
+        self, project_id: Optional[str], page_token: Optional[str]
+    ) -> Tuple[List[Any], Optional[str]]:
+        """Fetch one page of formatted dataset entries and the token for the page after it."""
+        iterator = self.bq_client.list_datasets(
+            project=project_id,
+            page_size=DATASETS_PAGE_SIZE,
+            page_token=page_token,
+        )
+        page = next(iterator.pages)
+        return [_format_dataset(ds) for ds in page], iterator.next_page_token
+
+    async def _list_datasets_page(
+        self, project_id: Optional[str], page_token: Optional[str]
+    ) -> Tuple[List[Any], Optional[str]]:
+        """Return a page of datasets, reusing a page fetched within the TTL."""
+        cache_key = (project_id or self.bq_client.project, page_token)
+        cached = self._datasets_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < DATASETS_CACHE_TTL_SECONDS:
+            return cached[1], cached[2]
+        
+        datasets, next_page_token = await self._fetch_once(
+            ("datasets",) + cache_key, self._fetch_datasets_page, project_id, page_token
+        )
+        self._cache_put(
+            self._datasets_cache, cache_key, (time.monotonic(), datasets, next_page_token)
+        )
+        return datasets, next_page_token
+
     async def _handle_list_datasets(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle list_datasets tool with pagination."""
         try:
             project_id = params.get("projectId")
             cursor = params.get("cursor")
             
-            page_size = 50
-            
-            start_index = 0
-            if cursor:
-                try:
-                    cursor_data = json.loads(cursor)
-                    start_index = cursor_data.get("index", 0)
-                except (json.JSONDecodeError, TypeError):
-                    raise Exception("Invalid cursor format")
-            
-            datasets = list(self.bq_client.list_datasets(project=project_id))
-            
-            end_index = min(start_index + page_size, len(datasets))
-            page_datasets = datasets[start_index:end_index]
-            
-            dataset_list = [
-                {
-                    "id": ds.dataset_id,
-                    "projectId": ds.project,
-                    "location": ds.location,
-                    "friendlyName": ds.friendly_name,
-                    "labels": ds.labels,
-                    "creationTime": ds.created.isoformat() if ds.created else None,
-                    "lastModifiedTime": ds.modified.isoformat() if ds.modified else None,
-                }
-                for ds in page_datasets
-            ]
-            
-            next_cursor = None
-            if end_index < len(datasets):
-                next_cursor = json.dumps({"index": end_index})
+            # The cursor is BigQuery's own page token, passed through opaquely.
+            dataset_list, next_cursor = await self._list_datasets_page(project_id, cursor)
             
             return {
                 "datasets": dataset_list,
                 "nextCursor": next_cursor,
             }
         except Exception as e:
-            logger.error(f"Error listing datasets: {e}")
+            logger.error("Error listing datasets: %s", e)
             raise Exception(f"BigQuery error: {str(e)}")
 
+    def _build_table_schema_response(
+        self, project_id: str, dataset_id: str, table_id: str, table: Any
+    ) -> Dict[str, Any]:
+        """Build the get_table_schema payload for a table, with timestamps pre-formatted."""
+        if self.expose_resources:
+            schema = {
+                "type": "resource",
+                "uri": f"bq://{project_id}/{dataset_id}/{table_id}/schema",
+            }
+        else:
+            schema = []
+            for field in table.schema:
+                field_info = _format_field(field)
+                if field.fields:
+                    field_info["fields"] = list(map(_format_field, field.fields))
+                schema.append(field_info)
+        
+        return {
+            "projectId": project_id,
+            "datasetId": dataset_id,
+            "tableId": table_id,
+            "schema": schema,
+            "rowCount": table.num_rows,
+            "creationTime": _iso(table.created),
+            "lastModifiedTime": _iso(table.modified),
+        }
+
     async def _handle_get_table_schema(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle get_table_schema tool."""
         try:
@@ -657,59 +1228,32 @@ class BigQueryMCPServer:
             dataset_id = params["datasetId"]
             table_id = params["tableId"]
             
-            table_ref = self.bq_client.dataset(dataset_id, project=project_id).table(table_id)
-            table = self.bq_client.get_table(table_ref)
+            cache_key = (project_id, dataset_id, table_id)
+            cached = self._table_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < TABLE_CACHE_TTL_SECONDS:
+                return cached[2]
             
-            schema_fields = []
-            for field in table.schema:
-                field_info = {
-                    "name": field.name,
-                    "type": field.field_type,
-                    "mode": field.mode,
-                    "description": field.description,
-                }
-                
-                if field.fields:
-                    field_info["fields"] = [
-                        {
-                            "name": nested.name,
-                            "type": nested.field_type,
-                            "mode": nested.mode,
-                            "description": nested.description,
-                        }
-                        for nested in field.fields
-                    ]
-                
-                schema_fields.append(field_info)
+            table = await self._fetch_once(
+                ("table",) + cache_key,
+                self.bq_client.get_table,
+                _table_ref(project_id, dataset_id, table_id),
+            )
             
-            if self.expose_resources:
-                resource_uri = f"bq://{project_id}/{dataset_id}/{table_id}/schema"
-                pass
-                
-                return {
-                    "projectId": project_id,
-                    "datasetId": dataset_id,
-                    "tableId": table_id,
-                    "schema": {
-                        "type": "resource",
-                        "uri": resource_uri,
-                    },
-                    "rowCount": table.num_rows,
-                    "creationTime": table.created.isoformat() if table.created else None,
-                    "lastModifiedTime": table.modified.isoformat() if table.modified else None,
-                }
+            # An unchanged etag means the stored payload is still accurate, so
+            # only its freshness timestamp needs renewing.
+            if cached and cached[1] == table.etag:
+                response = cached[2]
             else:
-                return {
-                    "projectId": project_id,
-                    "datasetId": dataset_id,
-                    "tableId": table_id,
-                    "schema": schema_fields,
-                    "rowCount": table.num_rows,
-                    "creationTime": table.created.isoformat() if table.created else None,
-                    "lastModifiedTime": table.modified.isoformat() if table.modified else None,
-                }
+                response = self._build_table_schema_response(
+                    project_id, dataset_id, table_id, table
+                )
+            
+            self._cache_put(
+                self._table_cache, cache_key, (time.monotonic(), table.etag, response)
+            )
+            return response
         except Exception as e:
-            logger.error(f"Error getting table schema: {e}")
+            logger.error("Error getting table schema: %s", e)
             raise Exception(f"BigQuery error: {str(e)}")
 
     def start(self) -> None:
@@ -743,7 +1287,7 @@ class BigQueryMCPServer:
                 logger.info("Stdio server started, waiting for input...")
                 signal.pause()
             except Exception as e:
-                logger.error(f"Error in stdio server: {e}")
+                logger.error("Error in stdio server: %s", e)
                 raise
 
 
@@ -785,6 +1329,11 @@ def main():
         default=30000,
         help="Timeout for BigQuery queries in milliseconds",
     )
+    parser.add_argument(
+        "--max-bytes-billed",
+        type=int,
+        help="Fail queries that would bill more than this many bytes; callers can only lower it",
+    )
     parser.add_argument(
         "--project-id",
         help="Default Google Cloud project ID to use",
@@ -803,6 +1352,7 @@ def main():
         query_timeout_ms=args.query_timeout_ms,
         default_project_id=args.project_id,
         default_location=args.location,
+        max_bytes_billed=args.max_bytes_billed,
     )
     server.start()
 
@@ -4,24 +4,47 @@ Implements MCP specification rev 2025-03-26 using FastMCP for tool registration
 but manual stdio handling for better Docker compatibility.
 """
 import argparse
+import asyncio
+import concurrent.futures
+import functools
 import json
 import logging
 import os
 import re
 import sys
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Dict, List, Optional
 
 from google.cloud import bigquery
 from fastmcp import FastMCP
-from mcp_bigquery_server.utils import qualify_information_schema_query
+from mcp_bigquery_server.utils import (
+    bytes_billed_limit,
+    dumps_json,
+    is_cacheable_query,
+    is_ddl_query,
+    is_information_schema_query,
+    is_multi_statement_query,
+    is_read_only_query,
+    loads_json,
+    qualify_information_schema_query,
+    query_cache_key,
+    rows_to_dicts,
+    schema_field_names,
+    to_query_parameters,
+)
+from mcp_bigquery_server.clients import get_clients
 from mcp_bigquery_server.env_utils import (
     get_project_id_from_env,
     get_location_from_env,
     get_credentials_path_from_env,
-    load_credentials_from_file,
+    get_io_threads_from_env,
 )
 
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -29,6 +52,116 @@ logging.basicConfig(
 )
 logger = logging.getLogger("mcp-bigquery-server")
 
+# How long a project's dataset listing is served from memory before re-fetching.
+DATASETS_CACHE_TTL_SECONDS = 60
+
+# Datasets requested per datasets.list call when collecting a full listing.
+DATASETS_LIST_PAGE_SIZE = 1000
+
+# How long a repeated read-only execute_query call returns the earlier job instead of submitting again.
+QUERY_CACHE_TTL_SECONDS = 60
+
+# Most rows one execute_query_with_results call returns; larger maxRows values are clamped.
+MAX_ROWS_PER_PAGE = 10000
+
+# Approximate cap on the bytes of rows one call returns, so a page of wide
+# STRING, BYTES or JSON columns stops short of MAX_ROWS_PER_PAGE rows.
+MAX_BYTES_PER_PAGE = 16 * 1024 * 1024
+
+# Upper bound on cached dataset listings and query submissions; the oldest entry is evicted first.
+METADATA_CACHE_MAX_ENTRIES = 1024
+
+# Tool definitions advertised by tools/list; built once at import time.
+TOOL_DEFINITIONS = [
+    {
+        "name": "execute_query",
+        "description": "Submit a SQL query to BigQuery, optionally as dry-run",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "projectId": {"type": "string"},
+                "location": {"type": "string"},
+                "sql": {"type": "string"},
+                "params": {
+                    "type": "object",
+                    "additionalProperties": True,
+                },
+                "dryRun": {"type": "boolean"},
+                "maximumBytesBilled": {"type": "integer", "minimum": 1},
+                "waitForCompletion": {"type": "boolean"},
+            },
+            "required": ["sql"],
+        },
+    },
+    {
+        "name": "execute_query_with_results",
+        "description": "Submit a SQL query to BigQuery and return results immediately",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "projectId": {"type": "string"},
+                "location": {"type": "string"},
+                "sql": {"type": "string"},
+                "params": {
+                    "type": "object",
+                    "additionalProperties": True,
+                },
+                "dryRun": {"type": "boolean"},
+                "maximumBytesBilled": {"type": "integer", "minimum": 1},
+                "maxRows": {"type": "integer", "minimum": 1},
+            },
+            "required": ["sql"],
+        },
+    },
+    {
+        "name": "batch_execute",
+        "description": "Run several SQL queries concurrently and return all their results",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "projectId": {"type": "string"},
+                "location": {"type": "string"},
+                "queries": {
+                    "type": "array",
+                    "minItems": 1,
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "sql": {"type": "string"},
+                            "params": {
+                                "type": "object",
+                                "additionalProperties": True,
+                            },
+                            "maxRows": {"type": "integer", "minimum": 1},
+                            "maximumBytesBilled": {"type": "integer", "minimum": 1},
+                        },
+                        "required": ["sql"],
+                    },
+                },
+            },
+            "required": ["queries"],
+        },
+    },
+    {
+        "name": "list_datasets",
+        "description": "List all datasets in a project",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "projectId": {"type": "string"},
+                "location": {"type": "string"},
+            },
+        },
+    },
+]
+
+# Input-schema validators compiled once per tool; empty when fastjsonschema is not installed.
+_TOOL_VALIDATORS = {}
+if fastjsonschema is not None:
+    _TOOL_VALIDATORS = {
+        tool["name"]: fastjsonschema.compile(tool["inputSchema"]) for tool in TOOL_DEFINITIONS
+    }
+
 sys.stdout.reconfigure(write_through=True)
 
 
@@ -44,6 +177,7 @@ class BigQueryMCPServer:
         query_timeout_ms: int = 30000,
         default_project_id: Optional[str] = None,
         default_location: Optional[str] = None,
+        max_bytes_billed: Optional[int] = None,
     ):
         """Initialize the BigQuery MCP server.
 
@@ -55,41 +189,37 @@ class BigQueryMCPServer:
             query_timeout_ms: Timeout for BigQuery queries in milliseconds.
             default_project_id: Default Google Cloud project ID to use.
             default_location: Default BigQuery location/region to use.
+            max_bytes_billed: Cap on bytes billed per query; BigQuery fails
+                queries that would exceed it before running them.
         """
         self.expose_resources = expose_resources
         self.http_enabled = http_enabled
         self.host = host
         self.port = port
         self.query_timeout_ms = query_timeout_ms
+        self.max_bytes_billed = max_bytes_billed
         
         self.default_project_id = default_project_id or get_project_id_from_env()
         self.default_location = default_location or get_location_from_env()
         self.credentials_path = get_credentials_path_from_env()
         
-        logger.info(f"Using project ID: {self.default_project_id}")
-        logger.info(f"Using location: {self.default_location}")
-        logger.info(f"Using credentials path: {self.credentials_path}")
+        logger.info("Using project ID: %s", self.default_project_id)
+        logger.info("Using location: %s", self.default_location)
+        logger.info("Using credentials path: %s", self.credentials_path)
         
-        credentials = None
-        if self.credentials_path:
-            try:
-                credentials = load_credentials_from_file(self.credentials_path)
-                
-                if not self.default_project_id and credentials:
-                    self.default_project_id = credentials.project_id
-                    logger.info(f"Using project ID from service account: {self.default_project_id}")
-            except FileNotFoundError as e:
-                logger.error(f"Error loading credentials: {e}")
-                raise
-        
-        self.bq_client = bigquery.Client(
-            project=self.default_project_id,
-            credentials=credentials,
-        )
+        self.bq_client, _ = get_clients(self.default_project_id, self.credentials_path)
+        if not self.default_project_id and self.credentials_path:
+            self.default_project_id = self.bq_client.project
+        self._datasets_cache: Dict[str, tuple] = {}
+        self._query_cache: Dict[str, tuple] = {}
+        self._metadata_fetches: Dict[str, asyncio.Future] = {}
+        # Collects responses while a JSON-RPC batch is being handled; None otherwise.
+        self._batch_responses: Optional[List[Dict[str, Any]]] = None
         
         logger.info(
-            f"BigQuery client initialized for project '{self.bq_client.project}' "
-            f"using service account '{self.bq_client._credentials.service_account_email}'"
+            "BigQuery client initialized for project '%s' using service account '%s'",
+            self.bq_client.project,
+            self.bq_client._credentials.service_account_email,
         )
 
         self.mcp = FastMCP(
@@ -99,158 +229,132 @@ class BigQueryMCPServer:
         self._register_tools()
 
     def _register_tools(self) -> None:
-        """Register all BigQuery tools with the MCP server using decorators."""
-        
-        @self.mcp.tool()
-        async def execute_query(
-            sql: str,
-            projectId: Optional[str] = None,
-            location: Optional[str] = None,
-            params: Optional[Dict[str, Any]] = None,
-            dryRun: bool = False,
-        ) -> Dict[str, Any]:
-            """Submit a SQL query to BigQuery, optionally as dry-run."""
-            try:
-                project = projectId or self.default_project_id
-                loc = location or self.default_location
-                
-                job_config = bigquery.QueryJobConfig(
-                    dry_run=dryRun,
-                    use_query_cache=True,
-                )
+        """Register all BigQuery tools with the MCP server."""
+        self.mcp.add_tool(
+            functools.partial(_execute_query, self),
+            name="execute_query",
+            description="Submit a SQL query to BigQuery, optionally as dry-run.",
+        )
+        self.mcp.add_tool(
+            functools.partial(_execute_query_with_results, self),
+            name="execute_query_with_results",
+            description="Submit a SQL query to BigQuery and return results immediately.",
+        )
+        self.mcp.add_tool(
+            functools.partial(_batch_execute, self),
+            name="batch_execute",
+            description="Run several SQL queries concurrently and return all their results.",
+        )
+        self.mcp.add_tool(
+            functools.partial(_list_datasets, self),
+            name="list_datasets",
+            description="List all datasets in a project.",
+        )
 
-                if params:
-                    pass  # Handle query parameters if needed
+    def _invalidate_metadata_cache(self) -> None:
+        """Drop cached dataset listings after a DDL statement."""
+        self._datasets_cache.clear()
 
-                query_job = self.bq_client.query(
-                    sql,
-                    job_config=job_config,
-                    project=project,
-                    location=loc,
-                )
+    def _invalidate_caches_after(self, sql: str) -> None:
+        """Drop cached state a statement may have made stale.
 
-                query_job.result(timeout=self.query_timeout_ms / 1000)
+        DML and DDL can change what an earlier SELECT would return, so any
+        statement that isn't read-only clears the reused query jobs; DDL and
+        multi-statement scripts also clear the dataset listings.
+        """
+        if is_read_only_query(sql):
+            return
+        self._query_cache.clear()
+        # A script's later statements may be DDL even when its first isn't.
+        if is_ddl_query(sql) or is_multi_statement_query(sql):
+            self._invalidate_metadata_cache()
 
-                if dryRun:
-                    return {
-                        "bytesProcessed": query_job.total_bytes_processed,
-                        "isDryRun": True,
-                        "projectId": project,
-                        "location": loc
-                    }
-                else:
-                    return {
-                        "jobId": query_job.job_id,
-                        "status": query_job.state,
-                        "bytesProcessed": query_job.total_bytes_processed,
-                        "projectId": project,
-                        "location": loc
-                    }
-            except Exception as e:
-                logger.error(f"Error executing query: {e}")
-        @self.mcp.tool()
-        async def execute_query_with_results(
-            sql: str,
-            projectId: Optional[str] = None,
-            location: Optional[str] = None,
-            params: Optional[Dict[str, Any]] = None,
-            dryRun: bool = False,
-            maxRows: int = 100,
-        ) -> Dict[str, Any]:
-            """Submit a SQL query to BigQuery and return results immediately."""
+    async def _cached_query_submission(
+        self, cache_key: str, wait_for_completion: bool
+    ) -> Optional[Dict[str, Any]]:
+        """Return the response of an identical execute_query call made within the TTL, if any.
+
+        A job that hadn't finished when it was cached is looked up again first:
+        if it has failed since, or can't be looked up, the entry is dropped so
+        the query is submitted afresh. A job still running is not reused for a
+        caller asking to wait for completion.
+        """
+        cached = self._query_cache.get(cache_key)
+        if cached is None or time.monotonic() - cached[0] >= QUERY_CACHE_TTL_SECONDS:
+            return None
+        response = cached[1]
+        if response["status"] != "DONE":
             try:
-                project = projectId or self.default_project_id
-                loc = location or self.default_location
-                
-                if "INFORMATION_SCHEMA" in sql.upper():
-                    region_match = re.search(r'FROM\s+`?region-([a-z0-9-]+)`?\.INFORMATION_SCHEMA', sql, re.IGNORECASE)
-                    if region_match:
-                        region_location = region_match.group(1).upper()
-                        logger.info(f"Detected region-specific query for region: {region_match.group(1)}, using location: {region_location}")
-                        loc = region_location
-                    
-                    logger.info(f"Transforming INFORMATION_SCHEMA query: {sql}")
-                    sql = qualify_information_schema_query(sql, project)
-                    logger.info(f"Transformed query: {sql}")
-                
-                job_config = bigquery.QueryJobConfig(
-                    dry_run=dryRun,
-                    use_query_cache=True,
+                job = await asyncio.to_thread(
+                    self.bq_client.get_job,
+                    response["jobId"],
+                    project=response["projectId"],
+                    location=response["location"],
                 )
+            except Exception as e:
+                logger.warning("Could not re-check cached job %s: %s", response["jobId"], e)
+                job = None
+            # A DML or DDL statement may have cleared the entry meanwhile.
+            if self._query_cache.get(cache_key) is not cached:
+                return None
+            if job is None or job.error_result:
+                del self._query_cache[cache_key]
+                return None
+            response = {**response, "status": job.state, "bytesProcessed": job.total_bytes_processed}
+            self._query_cache[cache_key] = (cached[0], response)
+        if wait_for_completion and response["status"] != "DONE":
+            return None
+        logger.info("Reusing job %s for repeated query", response["jobId"])
+        return response
 
-                query_job = self.bq_client.query(
-                    sql,
-                    job_config=job_config,
-                    project=project,
-                    location=loc,
-                )
+    def _remember_query_submission(
+        self, cache_key: Optional[str], query_job, response: Dict[str, Any]
+    ) -> None:
+        """Cache a read-only query's response unless its job has already failed."""
+        if cache_key is None or query_job.error_result:
+            return
+        if cache_key not in self._query_cache and len(self._query_cache) >= METADATA_CACHE_MAX_ENTRIES:
+            del self._query_cache[next(iter(self._query_cache))]
+        self._query_cache[cache_key] = (time.monotonic(), response)
 
-                if dryRun:
-                    query_job.result(timeout=self.query_timeout_ms / 1000)
-                    return {
-                        "bytesProcessed": query_job.total_bytes_processed,
-                        "isDryRun": True,
-                        "projectId": project,
-                        "location": loc
-                    }
-                
-                results = query_job.result(timeout=self.query_timeout_ms / 1000)
-                schema = [field.name for field in results.schema]
-                
-                rows = []
-                for i, row in enumerate(results):
-                    if i >= maxRows:
-                        break
-                    rows.append({field: value for field, value in zip(schema, row.values())})
-                
-                has_more = len(rows) == maxRows
-                
-                return {
-                    "jobId": query_job.job_id,
-                    "status": query_job.state,
-                    "bytesProcessed": query_job.total_bytes_processed,
-                    "rowCount": len(rows),
-                    "schema": schema,
-                    "hasMore": has_more,
-                    "nextOffset": len(rows) if has_more else None,
-                    "results": rows,
-                    "projectId": project,
-                    "location": loc
-                }
-            except Exception as e:
-                logger.error(f"Error executing query with results: {e}")
-                raise Exception(f"BigQuery error: {str(e)}")
+    def _fetch_datasets(self, project_id: Optional[str]) -> List[Dict[str, Any]]:
+        """Fetch every dataset in a project as formatted list_datasets entries.
 
-                raise Exception(f"BigQuery error: {str(e)}")
+        The location comes from the datasets.list resource itself, so no
+        per-dataset get_dataset call is needed.
+        """
+        return [
+            {
+                "id": ds.dataset_id,
+                "projectId": ds.project,
+                "location": ds._properties.get("location"),
+            }
+            for ds in self.bq_client.list_datasets(
+                project=project_id, page_size=DATASETS_LIST_PAGE_SIZE
+            )
+        ]
 
-        @self.mcp.tool()
-        async def list_datasets(
-            projectId: Optional[str] = None,
-            location: Optional[str] = None,
-        ) -> Dict[str, Any]:
-            """List all datasets in a project."""
-            try:
-                project = projectId or self.default_project_id
-                
-                datasets = list(self.bq_client.list_datasets(project=project))
-                
-                dataset_list = [
-                    {
-                        "id": ds.dataset_id,
-                        "projectId": ds.project,
-                        "location": ds.location,
-                    }
-                    for ds in datasets
-                ]
-                
-                return {
-                    "datasets": dataset_list,
-                    "projectId": project,
-                    "location": location
-                }
-            except Exception as e:
-                logger.error(f"Error listing datasets: {e}")
-                raise Exception(f"BigQuery error: {str(e)}")
+    async def _list_datasets_cached(self, project_id: Optional[str]) -> List[Dict[str, Any]]:
+        """Return every dataset in a project, reusing a listing fetched within the TTL.
+
+        Concurrent misses for the same project share a single listing call.
+        """
+        cache_key = project_id or self.bq_client.project
+        cached = self._datasets_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < DATASETS_CACHE_TTL_SECONDS:
+            return cached[1]
+        
+        pending = self._metadata_fetches.get(cache_key)
+        if pending is None:
+            pending = asyncio.ensure_future(asyncio.to_thread(self._fetch_datasets, project_id))
+            self._metadata_fetches[cache_key] = pending
+            pending.add_done_callback(lambda _: self._metadata_fetches.pop(cache_key, None))
+        datasets = await asyncio.shield(pending)
+        
+        if cache_key not in self._datasets_cache and len(self._datasets_cache) >= METADATA_CACHE_MAX_ENTRIES:
+            del self._datasets_cache[next(iter(self._datasets_cache))]
+        self._datasets_cache[cache_key] = (time.monotonic(), datasets)
+        return datasets
 
     def send_response(self, id: int, result: Any, is_tools_call: bool = False) -> None:
         """Send a JSON-RPC response.
@@ -265,7 +369,7 @@ class BigQueryMCPServer:
             id = 0
             
         if is_tools_call:
-            result_json = json.dumps(result)
+            result_json = dumps_json(result)
             formatted_result = {
                 "content": [
                     {
@@ -285,9 +389,13 @@ class BigQueryMCPServer:
                 "result": result,
                 "id": id,
             }
+
+        if self._batch_responses is not None:
+            self._batch_responses.append(response)
+            return
             
-        json_str = json.dumps(response)
-        logger.info(f"Sending response: {json_str}")
+        json_str = dumps_json(response)
+        logger.info("Sending response: %s", json_str)
         print(json_str, flush=True)
 
     def send_error(self, id: int, code: int, message: str) -> None:
@@ -303,13 +411,16 @@ class BigQueryMCPServer:
             },
             "id": id,
         }
-        json_str = json.dumps(response)
-        logger.info(f"Sending error: {json_str}")
+        if self._batch_responses is not None:
+            self._batch_responses.append(response)
+            return
+        json_str = dumps_json(response)
+        logger.info("Sending error: %s", json_str)
         print(json_str, flush=True)
 
     def handle_initialize(self, params: Dict[str, Any], request_id: int) -> None:
         """Handle initialize request."""
-        logger.info(f"Handling initialize request: {params}")
+        logger.info("Handling initialize request: %s", params)
         
         self.send_response(request_id, {
             "protocolVersion": "2024-11-05",
@@ -322,67 +433,24 @@ class BigQueryMCPServer:
 
     def handle_tools_list(self, params: Dict[str, Any], request_id: int) -> None:
         """Handle tools/list request."""
-        logger.info(f"Handling tools/list request: {params}")
-        
-        tools = [
-            {
-                "name": "execute_query",
-                "description": "Submit a SQL query to BigQuery, optionally as dry-run",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "projectId": {"type": "string"},
-                        "location": {"type": "string"},
-                        "sql": {"type": "string"},
-                        "params": {
-                            "type": "object",
-                            "additionalProperties": True,
-                        },
-                        "dryRun": {"type": "boolean"},
-                    },
-                    "required": ["sql"],
-                },
-            },
-            {
-                "name": "execute_query_with_results",
-                "description": "Submit a SQL query to BigQuery and return results immediately",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "projectId": {"type": "string"},
-                        "location": {"type": "string"},
-                        "sql": {"type": "string"},
-                        "params": {
-                            "type": "object",
-                            "additionalProperties": True,
-                        },
-                        "dryRun": {"type": "boolean"},
-                        "maxRows": {"type": "integer", "minimum": 1},
-                    },
-                    "required": ["sql"],
-                },
-            },
-            {
-                "name": "list_datasets",
-                "description": "List all datasets in a project",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "projectId": {"type": "string"},
-                        "location": {"type": "string"},
-                    },
-                },
-            },
-        ]
+        logger.info("Handling tools/list request: %s", params)
         
-        self.send_response(request_id, {"tools": tools})
+        self.send_response(request_id, {"tools": TOOL_DEFINITIONS})
 
     async def handle_call_tool(self, params: Dict[str, Any], request_id: int) -> None:
         """Handle call_tool request."""
         tool_name = params.get("tool")
         tool_params = params.get("params", {})
         
-        logger.info(f"Handling call_tool request: {tool_name} with params {tool_params}")
+        logger.info("Handling call_tool request: %s with params %s", tool_name, tool_params)
+
+        validate = _TOOL_VALIDATORS.get(tool_name)
+        if validate is not None:
+            try:
+                validate(tool_params)
+            except fastjsonschema.JsonSchemaValueException as e:
+                self.send_error(request_id, -32602, f"Invalid params: {e.message}")
+                return
         
         try:
             if tool_name == "execute_query":
@@ -395,36 +463,54 @@ class BigQueryMCPServer:
                 region_specific = False
                 region_location = None
                 
-                if "INFORMATION_SCHEMA" in sql.upper():
+                if is_information_schema_query(sql):
                     region_match = re.search(r'FROM\s+`?region-([a-z0-9-]+)`?\.INFORMATION_SCHEMA', sql, re.IGNORECASE)
                     if region_match:
                         region_specific = True
                         region_code = region_match.group(1)
                         region_location = region_code.upper()
-                        logger.info(f"Detected region-specific query for region: {region_code}, using location: {region_location}")
+                        logger.info("Detected region-specific query for region: %s, using location: %s", region_code, region_location)
                     
-                    logger.info(f"Transforming INFORMATION_SCHEMA query: {sql}")
+                    logger.info("Transforming INFORMATION_SCHEMA query: %s", sql)
                     sql = qualify_information_schema_query(sql, project_id)
-                    logger.info(f"Transformed query: {sql}")
+                    logger.info("Transformed query: %s", sql)
                 
                 if region_specific and region_location:
-                    logger.info(f"Using region-specific location: {region_location}")
+                    logger.info("Using region-specific location: %s", region_location)
                     location = region_location
                 
+                wait_for_completion = tool_params.get("waitForCompletion", False)
+                cache_key = None
+                if not dry_run and is_cacheable_query(sql):
+                    cache_key = query_cache_key(sql, query_params, project_id, location)
+                    cached = await self._cached_query_submission(cache_key, wait_for_completion)
+                    if cached is not None:
+                        self.send_response(request_id, cached, is_tools_call=True)
+                        return
+                
                 job_config = bigquery.QueryJobConfig(
                     dry_run=dry_run,
                     use_query_cache=True,
                 )
                 
-                query_job = self.bq_client.query(
+                if query_params:
+                    job_config.query_parameters = to_query_parameters(query_params)
+                
+                maximum_bytes_billed = bytes_billed_limit(
+                    self.max_bytes_billed, tool_params.get("maximumBytesBilled")
+                )
+                if maximum_bytes_billed is not None and not dry_run:
+                    job_config.maximum_bytes_billed = maximum_bytes_billed
+                
+                query_job = await asyncio.to_thread(
+                    self.bq_client.query,
                     sql,
                     job_config=job_config,
                     project=project_id,
                     location=location,
                 )
                 
-                query_job.result(timeout=self.query_timeout_ms / 1000)
-                
+                # Dry-run jobs are complete as soon as query() returns.
                 if dry_run:
                     result = {
                         "bytesProcessed": query_job.total_bytes_processed,
@@ -433,6 +519,12 @@ class BigQueryMCPServer:
                         "location": location
                     }
                 else:
+                    # query() has already submitted the job; callers poll for it
+                    # unless they ask to block until it finishes.
+                    if wait_for_completion:
+                        await asyncio.to_thread(query_job.result, timeout=self.query_timeout_ms / 1000)
+                    self._invalidate_caches_after(sql)
+                    
                     result = {
                         "jobId": query_job.job_id,
                         "status": query_job.state,
@@ -440,6 +532,7 @@ class BigQueryMCPServer:
                         "projectId": project_id,
                         "location": location
                     }
+                    self._remember_query_submission(cache_key, query_job, result)
                 
                 self.send_response(request_id, result, is_tools_call=True)
                 
@@ -449,25 +542,25 @@ class BigQueryMCPServer:
                 location = tool_params.get("location") or self.default_location
                 query_params = tool_params.get("params")
                 dry_run = tool_params.get("dryRun", False)
-                max_rows = tool_params.get("maxRows", 100)
+                max_rows = min(tool_params.get("maxRows", 100), MAX_ROWS_PER_PAGE)
                 
                 region_specific = False
                 region_location = None
                 
-                if "INFORMATION_SCHEMA" in sql.upper():
+                if is_information_schema_query(sql):
                     region_match = re.search(r'FROM\s+`?region-([a-z0-9-]+)`?\.INFORMATION_SCHEMA', sql, re.IGNORECASE)
                     if region_match:
                         region_specific = True
                         region_code = region_match.group(1)
                         region_location = region_code.upper()
-                        logger.info(f"Detected region-specific query for region: {region_code}, using location: {region_location}")
+                        logger.info("Detected region-specific query for region: %s, using location: %s", region_code, region_location)
                     
-                    logger.info(f"Transforming INFORMATION_SCHEMA query: {sql}")
+                    logger.info("Transforming INFORMATION_SCHEMA query: %s", sql)
                     sql = qualify_information_schema_query(sql, project_id)
-                    logger.info(f"Transformed query: {sql}")
+                    logger.info("Transformed query: %s", sql)
                 
                 if region_specific and region_location:
-                    logger.info(f"Using region-specific location: {region_location}")
+                    logger.info("Using region-specific location: %s", region_location)
                     location = region_location
                 
                 job_config = bigquery.QueryJobConfig(
@@ -475,15 +568,23 @@ class BigQueryMCPServer:
                     use_query_cache=True,
                 )
                 
-                query_job = self.bq_client.query(
-                    sql,
-                    job_config=job_config,
-                    project=project_id,
-                    location=location,
+                if query_params:
+                    job_config.query_parameters = to_query_parameters(query_params)
+                
+                maximum_bytes_billed = bytes_billed_limit(
+                    self.max_bytes_billed, tool_params.get("maximumBytesBilled")
                 )
+                if maximum_bytes_billed is not None and not dry_run:
+                    job_config.maximum_bytes_billed = maximum_bytes_billed
                 
                 if dry_run:
-                    query_job.result(timeout=self.query_timeout_ms / 1000)
+                    query_job = await asyncio.to_thread(
+                        self.bq_client.query,
+                        sql,
+                        job_config=job_config,
+                        project=project_id,
+                        location=location,
+                    )
                     result = {
                         "bytesProcessed": query_job.total_bytes_processed,
                         "isDryRun": True,
@@ -491,22 +592,33 @@ class BigQueryMCPServer:
                         "location": location
                     }
                 else:
-                    results = query_job.result(timeout=self.query_timeout_ms / 1000)
-                    schema = [field.name for field in results.schema]
+                    # jobs.query returns the first page of rows in the initial response,
+                    # saving the jobs.insert + jobs.getQueryResults round-trips.
+                    results = await asyncio.to_thread(
+                        self.bq_client.query_and_wait,
+                        sql,
+                        job_config=job_config,
+                        project=project_id,
+                        location=location,
+                        wait_timeout=self.query_timeout_ms / 1000,
+                        max_results=max_rows,
+                    )
+                    self._invalidate_caches_after(sql)
+                    schema = schema_field_names(results.schema)
                     
-                    rows = []
-                    for i, row in enumerate(results):
-                        if i >= max_rows:
-                            break
-                        rows.append({field: value for field, value in zip(schema, row.values())})
+                    rows = await asyncio.to_thread(
+                        rows_to_dicts, results, max_rows, max_bytes=MAX_BYTES_PER_PAGE
+                    )
                     
-                    has_more = len(rows) == max_rows
+                    total_rows = results.total_rows
+                    has_more = len(rows) == max_rows if total_rows is None else len(rows) < total_rows
                     
                     result = {
-                        "jobId": query_job.job_id,
-                        "status": query_job.state,
-                        "bytesProcessed": query_job.total_bytes_processed,
+                        "jobId": results.job_id,
+                        "status": "DONE",
+                        "bytesProcessed": results.total_bytes_processed,
                         "rowCount": len(rows),
+                        "totalRows": total_rows,
                         "schema": schema,
                         "hasMore": has_more,
                         "nextOffset": len(rows) if has_more else None,
@@ -517,27 +629,21 @@ class BigQueryMCPServer:
                 
                 self.send_response(request_id, result, is_tools_call=True)
                 
+            elif tool_name == "batch_execute":
+                result = await _batch_execute(
+                    self,
+                    tool_params.get("queries", []),
+                    projectId=tool_params.get("projectId"),
+                    location=tool_params.get("location"),
+                )
+                
+                self.send_response(request_id, result, is_tools_call=True)
+                
             elif tool_name == "list_datasets":
                 project_id = tool_params.get("projectId") or self.default_project_id
                 location = tool_params.get("location") or self.default_location
                 
-                datasets = list(self.bq_client.list_datasets(project=project_id))
-                
-                dataset_list = []
-                for ds in datasets:
-                    try:
-                        dataset_ref = self.bq_client.dataset(ds.dataset_id, project=ds.project)
-                        dataset = self.bq_client.get_dataset(dataset_ref)
-                        ds_location = dataset.location
-                    except Exception as e:
-                        logger.warning(f"Could not get location for dataset {ds.dataset_id}: {e}")
-                        ds_location = None
-                        
-                    dataset_list.append({
-                        "id": ds.dataset_id,
-                        "projectId": ds.project,
-                        "location": ds_location,
-                    })
+                dataset_list = await self._list_datasets_cached(project_id)
                 
                 result = {
                     "datasets": dataset_list,
@@ -549,66 +655,151 @@ class BigQueryMCPServer:
                 self.send_error(request_id, -32601, f"Unknown tool: {tool_name}")
                 
         except Exception as e:
-            logger.error(f"Error calling tool: {e}")
+            logger.error("Error calling tool: %s", e)
             self.send_error(request_id, -32603, f"Error calling tool: {str(e)}")
 
     def start_http(self) -> None:
         """Start the MCP server with HTTP transport."""
-        logger.info(f"Starting HTTP server on {self.host}:{self.port}...")
+        logger.info("Starting HTTP server on %s:%s...", self.host, self.port)
         self.mcp.run(transport="sse", host=self.host, port=self.port)
 
+    def _handle_request(self, request: Dict[str, Any]) -> Optional[Awaitable[None]]:
+        """
+        Dispatch one JSON-RPC request.
+
+        Tool calls are returned as a coroutine for the caller to run, so a batch
+        can run its tool calls concurrently; every other method is answered here.
+        """
+        method = request.get("method")
+        params = request.get("params")
+        request_id = request.get("id")
+
+        logger.info("Received request: %s with id %s", method, request_id)
+
+        if request_id is None:
+            request_id = 0
+
+        if not isinstance(method, str):
+            self.send_error(request_id, -32600, "Invalid Request: method must be a string")
+            return None
+        if params is None:
+            params = {}
+        elif not isinstance(params, dict):
+            self.send_error(request_id, -32602, "Invalid params: params must be an object")
+            return None
+
+        if method == "initialize":
+            self.handle_initialize(params, request_id)
+        elif method == "tools/list":
+            self.handle_tools_list(params, request_id)
+        elif method == "call_tool" or method == "tools/call":
+            if method == "tools/call":
+                tool_name = params.get("name")
+                tool_params = params.get("arguments", {})
+                params = {"tool": tool_name, "params": tool_params}
+                logger.info("Converted tools/call to call_tool format: %s", params)
+            return self.handle_call_tool(params, request_id)
+        elif method == "notifications/initialized" or method.startswith("notifications/"):
+            logger.info("Received notification: %s", method)
+        elif method == "resources/list":
+            self.send_response(request_id, {"resources": []})
+        elif method == "prompts/list":
+            self.send_response(request_id, {"prompts": []})
+        else:
+            self.send_error(request_id, -32601, f"Method not found: {method}")
+        return None
+
+    @staticmethod
+    async def _run_concurrently(calls: List[Awaitable[None]]) -> List[Any]:
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    def _handle_batch(self, requests: List[Any], loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Handle a JSON-RPC batch, running its tool calls concurrently and answering with one array.
+
+        Each entry is dispatched on its own, so an invalid or failing entry is
+        answered with an error for its id and the rest of the batch still runs;
+        a failing notification is only logged.
+        """
+        if not requests:
+            self.send_error(None, -32600, "Invalid Request: empty batch")
+            return
+
+        self._batch_responses = []
+        try:
+            calls = []
+            call_requests = []
+            for request in requests:
+                if not isinstance(request, dict):
+                    self.send_error(None, -32600, "Invalid Request")
+                    continue
+                try:
+                    call = self._handle_request(request)
+                except Exception as e:
+                    logger.error("Error handling batch request: %s", e)
+                    # Notifications get no response, not even an error.
+                    if "id" in request:
+                        self.send_error(request["id"], -32603, f"Internal error: {str(e)}")
+                    continue
+                if call is not None:
+                    calls.append(call)
+                    call_requests.append(request)
+            if calls:
+                outcomes = loop.run_until_complete(self._run_concurrently(calls))
+                for request, outcome in zip(call_requests, outcomes):
+                    if isinstance(outcome, Exception):
+                        logger.error("Error calling tool: %s", outcome)
+                        if "id" in request:
+                            self.send_error(request["id"], -32603, f"Error calling tool: {str(outcome)}")
+        finally:
+            responses, self._batch_responses = self._batch_responses, None
+
+        if responses:
+            json_str = dumps_json(responses)
+            logger.info("Sending batch response: %s", json_str)
+            print(json_str, flush=True)
+
     def start_stdio(self) -> None:
         """Start the MCP server with stdio transport."""
         logger.info("Starting stdio server...")
         
-        while True:
-            try:
-                line = sys.stdin.readline()
-                if not line:
-                    logger.info("Received EOF, exiting...")
-                    break
-                
+        # One event loop serves every request so the bounded thread pool that
+        # runs blocking BigQuery calls is created once, not once per tool call.
+        loop = asyncio.new_event_loop()
+        loop.set_default_executor(
+            concurrent.futures.ThreadPoolExecutor(
+                max_workers=get_io_threads_from_env(), thread_name_prefix="bq-mcp"
+            )
+        )
+        try:
+            while True:
                 try:
-                    request = json.loads(line)
-                    method = request.get("method")
-                    params = request.get("params", {})
-                    request_id = request.get("id")
-                    
-                    logger.info(f"Received request: {method} with id {request_id}")
-                    
-                    if request_id is None:
-                        request_id = 0
-                        
-                    if method == "initialize":
-                        self.handle_initialize(params, request_id)
-                    elif method == "tools/list":
-                        self.handle_tools_list(params, request_id)
-                    elif method == "call_tool" or method == "tools/call":
-                        import asyncio
-                        if method == "tools/call":
-                            tool_name = params.get("name")
-                            tool_params = params.get("arguments", {})
-                            params = {"tool": tool_name, "params": tool_params}
-                            logger.info(f"Converted tools/call to call_tool format: {params}")
-                        asyncio.run(self.handle_call_tool(params, request_id))
-                    elif method == "notifications/initialized" or method.startswith("notifications/"):
-                        logger.info(f"Received notification: {method}")
-                    elif method == "resources/list":
-                        self.send_response(request_id, {"resources": []})
-                    elif method == "prompts/list":
-                        self.send_response(request_id, {"prompts": []})
-                    else:
-                        self.send_error(request_id, -32601, f"Method not found: {method}")
-                except json.JSONDecodeError:
-                    logger.error(f"Invalid JSON: {line}")
-                    continue
+                    line = sys.stdin.readline()
+                    if not line:
+                        logger.info("Received EOF, exiting...")
+                        break
                 
-            except KeyboardInterrupt:
-                logger.info("Received keyboard interrupt, exiting...")
-                break
-            except Exception as e:
-                logger.error(f"Error in main loop: {e}")
-                continue
+                    try:
+                        request = loads_json(line)
+                        if isinstance(request, list):
+                            self._handle_batch(request, loop)
+                        else:
+                            call = self._handle_request(request)
+                            if call is not None:
+                                loop.run_until_complete(call)
+                    except json.JSONDecodeError:
+                        logger.error("Invalid JSON: %s", line)
+                        continue
+                
+                except KeyboardInterrupt:
+                    logger.info("Received keyboard interrupt, exiting...")
+                    break
+                except Exception as e:
+                    logger.error("Error in main loop: %s", e)
+                    continue
+        finally:
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
 
     def start(self) -> None:
         """Start the MCP server with the configured transport."""
@@ -618,6 +809,227 @@ class BigQueryMCPServer:
             self.start_stdio()
 
 
+async def _execute_query(
+    server: BigQueryMCPServer,
+    sql: str,
+    projectId: Optional[str] = None,
+    location: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None,
+    dryRun: bool = False,
+    waitForCompletion: bool = False,
+    maximumBytesBilled: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Submit a SQL query to BigQuery, optionally as dry-run."""
+    try:
+        project = projectId or server.default_project_id
+        loc = location or server.default_location
+
+        cache_key = None
+        if not dryRun and is_cacheable_query(sql):
+            cache_key = query_cache_key(sql, params, project, loc)
+            cached = await server._cached_query_submission(cache_key, waitForCompletion)
+            if cached is not None:
+                return cached
+
+        job_config = bigquery.QueryJobConfig(
+            dry_run=dryRun,
+            use_query_cache=True,
+        )
+
+        if params:
+            job_config.query_parameters = to_query_parameters(params)
+
+        maximum_bytes_billed = bytes_billed_limit(server.max_bytes_billed, maximumBytesBilled)
+        if maximum_bytes_billed is not None and not dryRun:
+            job_config.maximum_bytes_billed = maximum_bytes_billed
+
+        query_job = await asyncio.to_thread(
+            server.bq_client.query,
+            sql,
+            job_config=job_config,
+            project=project,
+            location=loc,
+        )
+
+        # Dry-run jobs are complete as soon as query() returns.
+        if dryRun:
+            return {
+                "bytesProcessed": query_job.total_bytes_processed,
+                "isDryRun": True,
+                "projectId": project,
+                "location": loc
+            }
+
+        # query() has already submitted the job; callers poll for it unless
+        # they ask to block until it finishes.
+        if waitForCompletion:
+            await asyncio.to_thread(query_job.result, timeout=server.query_timeout_ms / 1000)
+        server._invalidate_caches_after(sql)
+
+        response = {
+            "jobId": query_job.job_id,
+            "status": query_job.state,
+            "bytesProcessed": query_job.total_bytes_processed,
+            "projectId": project,
+            "location": loc
+        }
+        server._remember_query_submission(cache_key, query_job, response)
+        return response
+    except Exception as e:
+        logger.error("Error executing query: %s", e)
+        raise Exception(f"BigQuery error: {str(e)}")
+
+
+async def _execute_query_with_results(
+    server: BigQueryMCPServer,
+    sql: str,
+    projectId: Optional[str] = None,
+    location: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None,
+    dryRun: bool = False,
+    maxRows: int = 100,
+    maximumBytesBilled: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Submit a SQL query to BigQuery and return results immediately."""
+    try:
+        project = projectId or server.default_project_id
+        loc = location or server.default_location
+        maxRows = min(maxRows, MAX_ROWS_PER_PAGE)
+
+        if is_information_schema_query(sql):
+            region_match = re.search(r'FROM\s+`?region-([a-z0-9-]+)`?\.INFORMATION_SCHEMA', sql, re.IGNORECASE)
+            if region_match:
+                region_location = region_match.group(1).upper()
+                logger.info("Detected region-specific query for region: %s, using location: %s", region_match.group(1), region_location)
+                loc = region_location
+
+            logger.info("Transforming INFORMATION_SCHEMA query: %s", sql)
+            sql = qualify_information_schema_query(sql, project)
+            logger.info("Transformed query: %s", sql)
+
+        job_config = bigquery.QueryJobConfig(
+            dry_run=dryRun,
+            use_query_cache=True,
+        )
+
+        if params:
+            job_config.query_parameters = to_query_parameters(params)
+
+        maximum_bytes_billed = bytes_billed_limit(server.max_bytes_billed, maximumBytesBilled)
+        if maximum_bytes_billed is not None and not dryRun:
+            job_config.maximum_bytes_billed = maximum_bytes_billed
+
+        if dryRun:
+            query_job = await asyncio.to_thread(
+                server.bq_client.query,
+                sql,
+                job_config=job_config,
+                project=project,
+                location=loc,
+            )
+            return {
+                "bytesProcessed": query_job.total_bytes_processed,
+                "isDryRun": True,
+                "projectId": project,
+                "location": loc
+            }
+
+        # jobs.query returns the first page of rows in the initial response,
+        # saving the jobs.insert + jobs.getQueryResults round-trips.
+        results = await asyncio.to_thread(
+            server.bq_client.query_and_wait,
+            sql,
+            job_config=job_config,
+            project=project,
+            location=loc,
+            wait_timeout=server.query_timeout_ms / 1000,
+            max_results=maxRows,
+        )
+        server._invalidate_caches_after(sql)
+        schema = schema_field_names(results.schema)
+
+        rows = await asyncio.to_thread(rows_to_dicts, results, maxRows, max_bytes=MAX_BYTES_PER_PAGE)
+
+        # total_rows comes with the first page; it is None only for
+        # statements that produce no result table.
+        total_rows = results.total_rows
+        has_more = len(rows) == maxRows if total_rows is None else len(rows) < total_rows
+
+        return {
+            "jobId": results.job_id,
+            "status": "DONE",
+            "bytesProcessed": results.total_bytes_processed,
+            "rowCount": len(rows),
+            "totalRows": total_rows,
+            "schema": schema,
+            "hasMore": has_more,
+            "nextOffset": len(rows) if has_more else None,
+            "results": rows,
+            "projectId": project,
+            "location": loc
+        }
+    except Exception as e:
+        logger.error("Error executing query with results: %s", e)
+        raise Exception(f"BigQuery error: {str(e)}")
+
+
+async def _batch_execute(
+    server: BigQueryMCPServer,
+    queries: List[Dict[str, Any]],
+    projectId: Optional[str] = None,
+    location: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Run several SQL queries concurrently and return all their results."""
+    try:
+        outcomes = await asyncio.gather(
+            *(
+                _execute_query_with_results(
+                    server,
+                    query["sql"],
+                    projectId=query.get("projectId", projectId),
+                    location=query.get("location", location),
+                    params=query.get("params"),
+                    dryRun=query.get("dryRun", False),
+                    maxRows=query.get("maxRows", 100),
+                    maximumBytesBilled=query.get("maximumBytesBilled"),
+                )
+                for query in queries
+            ),
+            return_exceptions=True,
+        )
+        
+        return {
+            "results": [
+                {"error": str(outcome)} if isinstance(outcome, Exception) else outcome
+                for outcome in outcomes
+            ],
+        }
+    except Exception as e:
+        logger.error("Error executing query batch: %s", e)
+        raise Exception(f"BigQuery error: {str(e)}")
+
+
+async def _list_datasets(
+    server: BigQueryMCPServer,
+    projectId: Optional[str] = None,
+    location: Optional[str] = None,
+) -> Dict[str, Any]:
+    """List all datasets in a project."""
+    try:
+        project = projectId or server.default_project_id
+
+        dataset_list = await server._list_datasets_cached(project)
+
+        return {
+            "datasets": dataset_list,
+            "projectId": project,
+            "location": location
+        }
+    except Exception as e:
+        logger.error("Error listing datasets: %s", e)
+        raise Exception(f"BigQuery error: {str(e)}")
+
+
 def main():
     """Main entry point for the MCP BigQuery server."""
     parser = argparse.ArgumentParser(description="MCP BigQuery Server")
@@ -656,6 +1068,11 @@ def main():
         default=30000,
         help="Timeout for BigQuery queries in milliseconds",
     )
+    parser.add_argument(
+        "--max-bytes-billed",
+        type=int,
+        help="Fail queries that would bill more than this many bytes; callers can only lower it",
+    )
     parser.add_argument(
         "--project-id",
         help="Default Google Cloud project ID to use",
@@ -676,6 +1093,7 @@ def main():
         query_timeout_ms=args.query_timeout_ms,
         default_project_id=args.project_id,
         default_location=args.location,
+        max_bytes_billed=args.max_bytes_billed,
     )
     server.start()
 
@@ -1,50 +1,512 @@
 """
 MCP BigQuery Server utility functions.
 """
+import datetime
+import decimal
+import functools
+import hashlib
+import itertools
+import json
 import re
 import logging
+import operator
+from typing import Any, Optional, Tuple, Union
+
+from google.cloud import bigquery
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
 
 logger = logging.getLogger("mcp-bigquery-server")
 
-def qualify_information_schema_query(sql: str, project_id: str) -> str:
+_INFORMATION_SCHEMA_RE = re.compile(r'INFORMATION_SCHEMA', re.IGNORECASE)
+
+_INFORMATION_SCHEMA_FROM_RE = re.compile(
+    r'FROM\s+(?:`?([^`\.]+(?:-[^`\.]+)?)`?\.)?INFORMATION_SCHEMA\.([A-Za-z_]+)', re.IGNORECASE
+)
+
+_DDL_RE = re.compile(r'^\s*(CREATE|ALTER|DROP|TRUNCATE)\b', re.IGNORECASE)
+
+_READ_ONLY_RE = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+
+# A quoted literal or identifier, or a comment; blanked out before looking for
+# statement separators and function names.
+_SQL_QUOTED_OR_COMMENT_RE = re.compile(
+    r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`|--[^\n]*|#[^\n]*|/\*.*?\*/""", re.DOTALL
+)
+
+# Functions whose result changes between runs, so a job running them can't be reused.
+_NON_DETERMINISTIC_RE = re.compile(
+    r'\b(CURRENT_(?:DATE|DATETIME|TIME|TIMESTAMP)|RAND|GENERATE_UUID|SESSION_USER|NOW)\b',
+    re.IGNORECASE,
+)
+
+# A quoted literal or identifier (kept verbatim), or a run of whitespace.
+_SQL_WHITESPACE_RE = re.compile(r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)|\s+""")
+
+def is_information_schema_query(sql: str) -> bool:
     """
-    Transform INFORMATION_SCHEMA queries by properly qualifying them with backticks and project ID.
-    Different INFORMATION_SCHEMA tables require different access patterns.
+    Check whether a SQL query references INFORMATION_SCHEMA, ignoring case.
+    
+    Scans the string in place rather than upper-casing a copy of the whole query.
     
     Args:
-        sql: The SQL query to transform
-        project_id: The Google Cloud project ID
+        sql: The SQL query to check
         
     Returns:
-        Transformed SQL query
+        True if the query mentions INFORMATION_SCHEMA
     """
-    if not project_id:
-        logger.warning("No project ID provided for INFORMATION_SCHEMA query transformation")
-        return sql
+    return _INFORMATION_SCHEMA_RE.search(sql) is not None
+
+def is_ddl_query(sql: str) -> bool:
+    """
+    Check whether a SQL statement creates, alters, drops or truncates an object.
     
-    if f"`{project_id}`" in sql or f"`{project_id}." in sql:
-        logger.info(f"Query already contains project ID '{project_id}', skipping transformation")
-        return sql
+    Args:
+        sql: The SQL query to check
+        
+    Returns:
+        True if the statement starts with a DDL keyword
+    """
+    return _DDL_RE.match(sql) is not None
+
+def _sql_code(sql: str) -> str:
+    """Return sql with quoted literals, identifiers and comments blanked out."""
+    return _SQL_QUOTED_OR_COMMENT_RE.sub(" ", sql)
+
+def is_multi_statement_query(sql: str) -> bool:
+    """
+    Check whether SQL text is a script of several statements.
+    
+    Args:
+        sql: The SQL query to check
+        
+    Returns:
+        True if a semicolon outside quotes and comments separates two statements
+    """
+    return ";" in _sql_code(sql).strip().rstrip(";")
+
+def is_read_only_query(sql: str) -> bool:
+    """
+    Check whether a SQL statement is a plain SELECT query.
+    
+    A script is never read-only, even when it starts with SELECT, since any
+    later statement may modify data.
+    
+    Args:
+        sql: The SQL query to check
+        
+    Returns:
+        True if the text is one statement starting with SELECT or WITH
+    """
+    return _READ_ONLY_RE.match(sql) is not None and not is_multi_statement_query(sql)
+
+def is_cacheable_query(sql: str) -> bool:
+    """
+    Check whether a query's job can be handed out again for an identical call.
+    
+    Args:
+        sql: The SQL query to check
+        
+    Returns:
+        True if the query is read-only and calls no non-deterministic function
+        such as CURRENT_TIMESTAMP() or RAND()
+    """
+    return is_read_only_query(sql) and _NON_DETERMINISTIC_RE.search(_sql_code(sql)) is None
+
+def _collapse_whitespace(match) -> str:
+    """Replace a whitespace run with one space or newline, keeping quoted text as is."""
+    if match.group(1):
+        return match.group(1)
+    # Keep line breaks so a trailing "--" comment can't swallow the next line.
+    return "\n" if "\n" in match.group(0) else " "
+
+def query_cache_key(sql: str, params: Optional[dict], project_id: Optional[str], location: Optional[str]) -> str:
+    """
+    Build a cache key for a query submission that ignores formatting differences.
+    
+    Leading, trailing and repeated whitespace outside quoted literals is
+    collapsed, so queries that differ only in layout share a key.
+    
+    Args:
+        sql: The SQL query
+        params: Query parameters, or None
+        project_id: Project the query runs in
+        location: Location the query runs in
         
-    pattern = r'FROM\s+(?:`?([^`\.]+(?:-[^`\.]+)?)`?\.)?INFORMATION_SCHEMA\.([A-Za-z_]+)'
+    Returns:
+        Hex digest identifying the normalized query, parameters, project and location
+    """
+    normalized = _SQL_WHITESPACE_RE.sub(_collapse_whitespace, sql.strip())
+    payload = json.dumps(
+        [normalized, params or {}, project_id, location], sort_keys=True, default=str
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+@functools.lru_cache(maxsize=64)
+def _information_schema_replacer(project_id: str):
+    """
+    Build the substitution function qualify_information_schema_query applies for a project.
     
+    Args:
+        project_id: The Google Cloud project ID
+        
+    Returns:
+        Function mapping an _INFORMATION_SCHEMA_FROM_RE match to its qualified FROM clause
+    """
     def replace(match):
         dataset = match.group(1)
         info_type = match.group(2)
         
         if info_type.upper() == "DATASETS":
             if dataset and dataset.startswith('region-'):
-                logger.info(f"Converting DATASETS to SCHEMATA for region-specific query")
+                logger.info("Converting DATASETS to SCHEMATA for region-specific query")
                 return f'FROM `{project_id}`.INFORMATION_SCHEMA.SCHEMATA'
             else:
                 return f'FROM `{project_id}`.INFORMATION_SCHEMA.SCHEMATA'
         
         if dataset and dataset.startswith('region-'):
-            logger.info(f"Detected region-specific dataset: {dataset}")
+            logger.info("Detected region-specific dataset: %s", dataset)
             return f'FROM INFORMATION_SCHEMA.{info_type}'
         elif dataset:
             return f'FROM `{project_id}.{dataset}.INFORMATION_SCHEMA.{info_type}`'
         else:
             return f'FROM `{project_id}.INFORMATION_SCHEMA.{info_type}`'
     
-    return re.sub(pattern, replace, sql, flags=re.IGNORECASE)
+    return replace
+
+def qualify_information_schema_query(sql: str, project_id: str) -> str:
+    """
+    Transform INFORMATION_SCHEMA queries by properly qualifying them with backticks and project ID.
+    Different INFORMATION_SCHEMA tables require different access patterns.
+    
+    Args:
+        sql: The SQL query to transform
+        project_id: The Google Cloud project ID
+        
+    Returns:
+        Transformed SQL query
+    """
+    if not is_information_schema_query(sql):
+        return sql
+    
+    if not project_id:
+        logger.warning("No project ID provided for INFORMATION_SCHEMA query transformation")
+        return sql
+    
+    if f"`{project_id}`" in sql or f"`{project_id}." in sql:
+        logger.info("Query already contains project ID '%s', skipping transformation", project_id)
+        return sql
+    
+    return _INFORMATION_SCHEMA_FROM_RE.sub(_information_schema_replacer(project_id), sql)
+
+
+# Checked in order: bool before int because bool subclasses int, and datetime
+# before date because datetime subclasses date.
+_SCALAR_PARAMETER_TYPES = (
+    (bool, "BOOL"),
+    (int, "INT64"),
+    (float, "FLOAT64"),
+    (str, "STRING"),
+    (bytes, "BYTES"),
+    (decimal.Decimal, "NUMERIC"),
+    (datetime.datetime, "TIMESTAMP"),
+    (datetime.date, "DATE"),
+    (datetime.time, "TIME"),
+)
+
+def _infer_bq_type(name: str, value) -> str:
+    """
+    Map a Python parameter value to its BigQuery standard SQL type name.
+    
+    Args:
+        name: Parameter name, used in the error message
+        value: Parameter value
+        
+    Returns:
+        BigQuery type name such as "INT64"; None is typed as "STRING"
+        
+    Raises:
+        ValueError: If the value has an unsupported type
+    """
+    if value is None:
+        return "STRING"
+    
+    for python_type, bq_type in _SCALAR_PARAMETER_TYPES:
+        if isinstance(value, python_type):
+            return bq_type
+    
+    raise ValueError(
+        f"Unsupported type for query parameter '{name}': {type(value).__name__}"
+    )
+
+def to_query_parameters(params: dict) -> list:
+    """
+    Convert a mapping of named query parameters into BigQuery query parameters.
+    
+    Lists and tuples become ARRAY parameters typed from their first non-null
+    element; an empty array is typed as ARRAY<STRING>. Since JSON has no date,
+    timestamp or numeric types, a value may also be given explicitly as
+    {"type": "DATE", "value": "2024-01-01"}; a list value then becomes an ARRAY
+    of that type.
+    
+    Args:
+        params: Mapping of parameter name to value, as received from the tool call
+        
+    Returns:
+        List of ScalarQueryParameter and ArrayQueryParameter objects suitable for
+        QueryJobConfig.query_parameters
+        
+    Raises:
+        ValueError: If a parameter value has an unsupported type
+    """
+    query_parameters = []
+    for name, value in params.items():
+        if isinstance(value, dict):
+            if "type" not in value:
+                raise ValueError(f"Query parameter '{name}' must be a value or an object with a 'type' key")
+            bq_type = str(value["type"]).upper()
+            typed_value = value.get("value")
+            if isinstance(typed_value, (list, tuple)):
+                query_parameters.append(bigquery.ArrayQueryParameter(name, bq_type, list(typed_value)))
+            else:
+                query_parameters.append(bigquery.ScalarQueryParameter(name, bq_type, typed_value))
+        elif isinstance(value, (list, tuple)):
+            first = next((item for item in value if item is not None), None)
+            if isinstance(first, (list, tuple)):
+                raise ValueError(f"Nested arrays are not supported for query parameter '{name}'")
+            query_parameters.append(
+                bigquery.ArrayQueryParameter(name, _infer_bq_type(name, first), list(value))
+            )
+        else:
+            query_parameters.append(
+                bigquery.ScalarQueryParameter(name, _infer_bq_type(name, value), value)
+            )
+    
+    return query_parameters
+
+def bytes_billed_limit(server_limit: Optional[int], requested: Optional[int]) -> Optional[int]:
+    """
+    Combine the server-wide and per-query caps on bytes billed.
+    
+    A query may lower the server's cap but never raise it.
+    
+    Args:
+        server_limit: Cap configured for the server, or None for no cap
+        requested: Cap requested for this query, or None
+        
+    Returns:
+        The smaller of the two caps, or None if neither is set
+    """
+    limits = [limit for limit in (server_limit, requested) if limit is not None]
+    return min(limits) if limits else None
+
+_field_name = operator.attrgetter("name")
+
+def schema_field_names(schema) -> tuple:
+    """
+    Return the column names of a result schema as a tuple.
+    
+    RowIterator.schema copies its field list on every access, so callers should
+    read it once and pass it here rather than touching it per column.
+    
+    Args:
+        schema: List of SchemaField objects
+        
+    Returns:
+        Tuple of column names, in schema order
+    """
+    return tuple(map(_field_name, schema))
+
+# Bytes each value of a fixed-width column type takes in Arrow, used to
+# estimate a row's size on the REST path; other columns are measured.
+_FIXED_WIDTH_TYPE_BYTES = {
+    "BOOL": 1,
+    "BOOLEAN": 1,
+    "INT64": 8,
+    "INTEGER": 8,
+    "FLOAT64": 8,
+    "FLOAT": 8,
+    "DATE": 4,
+    "TIME": 8,
+    "DATETIME": 8,
+    "TIMESTAMP": 8,
+    "NUMERIC": 16,
+    "BIGNUMERIC": 32,
+}
+
+def _value_nbytes(value) -> int:
+    """Estimate the bytes a variable-width or nested value holds."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(map(_value_nbytes, value.values()))
+    if isinstance(value, list):
+        return sum(map(_value_nbytes, value))
+    return 8
+
+def _row_size_estimator(schema) -> Tuple[int, list]:
+    """
+    Split a result schema into the bytes its fixed-width columns take per row
+    and the names of the columns whose values must be measured.
+    """
+    fixed_bytes = 0
+    measured = []
+    for field in schema:
+        width = _FIXED_WIDTH_TYPE_BYTES.get(field.field_type)
+        if width is None or field.mode == "REPEATED":
+            measured.append(field.name)
+        else:
+            fixed_bytes += width
+    return fixed_bytes, measured
+
+def rows_to_dicts(
+    results, max_rows: Optional[int] = None, bqstorage_client=None, max_bytes: Optional[int] = None
+) -> list:
+    """
+    Materialize a BigQuery RowIterator into a list of column-name -> value dicts.
+    
+    When pyarrow is installed each page is decoded column-wise as a RecordBatch
+    and converted in C via to_pylist(), so only one page of Arrow data is held
+    alongside the output at a time; otherwise each Row is passed to dict(),
+    which reads its values in schema order without copying them (Row.values()
+    and Row.items() deep-copy), mapped over the rows in C.
+    This performs network I/O for any pages not yet fetched, so call it from a
+    worker thread.
+    
+    Reading stops early once the rows pass max_bytes: the Arrow path counts each
+    RecordBatch's nbytes and keeps the share of the last batch that fits, and
+    the REST path estimates each row's size from its schema. At least one row
+    is always returned, so a caller paging by len(rows) makes progress.
+    
+    Args:
+        results: RowIterator returned by a query or job result call
+        max_rows: Maximum number of rows to return, or None for all rows
+        bqstorage_client: Optional BigQueryReadClient used to stream the pages
+            over the Storage Read API; the REST endpoint is used when None or
+            when the iterator cannot be read through the Storage API
+        max_bytes: Approximate cap on the size of the returned rows, or None
+            for no cap
+        
+    Returns:
+        List of row dicts
+    """
+    if pyarrow is not None:
+        rows = []
+        used_bytes = 0
+        for batch in results.to_arrow_iterable(bqstorage_client=bqstorage_client):
+            if max_rows is not None:
+                batch = batch.slice(0, max_rows - len(rows))
+            if max_bytes is not None and batch.num_rows:
+                batch_bytes = batch.nbytes
+                if used_bytes + batch_bytes > max_bytes:
+                    fit = batch.num_rows * (max_bytes - used_bytes) // batch_bytes
+                    rows.extend(batch.slice(0, max(fit, 0 if rows else 1)).to_pylist())
+                    break
+                used_bytes += batch_bytes
+            rows.extend(batch.to_pylist())
+            if max_rows is not None and len(rows) >= max_rows:
+                break
+        return rows
+    
+    schema = results.schema
+    if max_rows is not None:
+        results = itertools.islice(results, max_rows)
+    if max_bytes is None:
+        return list(map(dict, results))
+    
+    # Each row is measured through the dict that is returned, so it is
+    # materialized once.
+    fixed_bytes, measured = _row_size_estimator(schema)
+    rows = []
+    used_bytes = 0
+    for row in map(dict, results):
+        used_bytes += fixed_bytes + sum(_value_nbytes(row[name]) for name in measured)
+        if rows and used_bytes > max_bytes:
+            break
+        rows.append(row)
+    return rows
+
+ARROW_STREAM_MIME_TYPE = "application/vnd.apache.arrow.stream"
+
+def encode_rows_resource(
+    results, max_rows: Optional[int] = None, bqstorage_client=None
+) -> Tuple[Union[bytes, str], str]:
+    """
+    Encode a BigQuery RowIterator as the body of a result resource.
+    
+    When pyarrow is installed the rows are written as an Arrow IPC stream, one
+    record batch per page, without ever building per-row Python objects;
+    otherwise they are converted with rows_to_dicts and returned as JSON text.
+    This performs network I/O, so call it from a worker thread.
+    
+    Args:
+        results: RowIterator returned by a query or job result call
+        max_rows: Maximum number of rows to encode, or None for all rows
+        bqstorage_client: Optional BigQueryReadClient used to stream the pages
+        
+    Returns:
+        Tuple of (content, MIME type)
+    """
+    if pyarrow is None:
+        return dumps_json(rows_to_dicts(results, max_rows, bqstorage_client)), "application/json"
+    
+    sink = pyarrow.BufferOutputStream()
+    writer = None
+    count = 0
+    for batch in results.to_arrow_iterable(bqstorage_client=bqstorage_client):
+        if max_rows is not None:
+            batch = batch.slice(0, max_rows - count)
+        if writer is None:
+            writer = pyarrow.ipc.new_stream(sink, batch.schema)
+        writer.write_batch(batch)
+        count += batch.num_rows
+        if max_rows is not None and count >= max_rows:
+            break
+    if writer is None:
+        # No pages at all; still emit a valid, empty stream.
+        writer = pyarrow.ipc.new_stream(sink, pyarrow.schema([]))
+    writer.close()
+    return sink.getvalue().to_pybytes(), ARROW_STREAM_MIME_TYPE
+
+def dumps_json(obj: Any) -> str:
+    """
+    Serialize a response object to a JSON string.
+    
+    Uses orjson when it is installed, which encodes several times faster than the
+    standard library and produces compact output; otherwise falls back to json.dumps.
+    
+    Args:
+        obj: JSON-serializable object
+        
+    Returns:
+        JSON text
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """
+    Parse a JSON request line.
+    
+    Uses orjson when it is installed and json.loads otherwise. Either way, malformed
+    input raises json.JSONDecodeError.
+    
+    Args:
+        data: JSON text
+        
+    Returns:
+        Parsed object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,13 +1,22 @@
 """
 Direct test script for BigQuery operations.
 This script tests BigQuery operations directly without using the MCP server.
+
+Query rows are read as Arrow record batches over the BigQuery Storage Read API
+when google-cloud-bigquery-storage and pyarrow are installed, and over the REST
+API otherwise; install or omit those packages to choose which path a run covers.
 """
-import json
+import concurrent.futures
 import logging
 import os
 import sys
 
 from google.cloud import bigquery
+from google.oauth2 import service_account
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../utils"))
+from bq_client import bigquery_storage, iter_rows
+from metadata_cache import load_cached_metadata, metadata_cache_path, save_cached_metadata
 
 logging.basicConfig(
     level=logging.INFO,
@@ -21,55 +30,92 @@ if not os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
     sys.exit(1)
 
 try:
-    with open(os.environ["GOOGLE_APPLICATION_CREDENTIALS"], "r") as f:
-        service_account = json.load(f)
-        project_id = service_account.get("project_id")
-        if not project_id:
-            logger.error("Could not find project_id in service account key file.")
-            sys.exit(1)
-        logger.info(f"Using project ID: {project_id}")
+    # Parse the key file once; the client reuses these credentials instead of
+    # reading and parsing it again.
+    credentials = service_account.Credentials.from_service_account_file(
+        os.environ["GOOGLE_APPLICATION_CREDENTIALS"],
+        scopes=bigquery.Client.SCOPE,
+    )
+    project_id = credentials.project_id
+    if not project_id:
+        logger.error("Could not find project_id in service account key file.")
+        sys.exit(1)
+    logger.info(f"Using project ID: {project_id}")
 except Exception as e:
     logger.error(f"Error reading service account key file: {e}")
     sys.exit(1)
 
+def fetch_metadata(client):
+    """Fetch the dataset listing and the schema of the first table found."""
+    logger.info("Testing list_datasets...")
+    datasets = [dataset.dataset_id for dataset in client.list_datasets()]
+    
+    table = None
+    if datasets:
+        dataset_id = datasets[0]
+        tables = list(client.list_tables(dataset_id))
+        
+        if tables:
+            table_id = tables[0].table_id
+            logger.info(f"Testing get_table_schema for {dataset_id}.{table_id}...")
+            
+            schema = client.get_table(f"{dataset_id}.{table_id}").schema
+            table = {
+                "dataset_id": dataset_id,
+                "table_id": table_id,
+                "schema": [[field.name, field.field_type] for field in schema],
+            }
+    
+    return {"datasets": datasets, "table": table}
+
 def test_bigquery_operations():
     """Test BigQuery operations directly."""
     try:
         logger.info("Creating BigQuery client...")
-        client = bigquery.Client()
+        client = bigquery.Client(project=project_id, credentials=credentials)
+        bqstorage_client = None
+        if bigquery_storage is not None:
+            bqstorage_client = bigquery_storage.BigQueryReadClient(credentials=credentials)
         
         logger.info("Testing query execution...")
         query = "SELECT 1 as test"
         
-        job_config = bigquery.QueryJobConfig(dry_run=True)
-        query_job = client.query(query, job_config=job_config)
-        logger.info(f"Dry run processed {query_job.total_bytes_processed} bytes")
+        metadata = load_cached_metadata(project_id)
         
-        query_job = client.query(query)
-        results = query_job.result()
-        rows = list(results)
-        logger.info(f"Query returned {len(rows)} rows")
-        for row in rows:
-            logger.info(f"Row: {row}")
+        # The dry run, the real query and the metadata fetch are independent
+        # network calls, so run them side by side.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            dry_run_job = executor.submit(
+                client.query, query, job_config=bigquery.QueryJobConfig(dry_run=True)
+            )
+            query_rows = executor.submit(lambda: client.query(query).result(page_size=1000))
+            fetched_metadata = executor.submit(fetch_metadata, client) if metadata is None else None
+            
+            logger.info(f"Dry run processed {dry_run_job.result().total_bytes_processed} bytes")
+            
+            # Walk the rows page by page rather than collecting them all first.
+            row_count = 0
+            for row in iter_rows(query_rows.result(), bqstorage_client):
+                logger.info(f"Row: {row}")
+                row_count += 1
+            logger.info(f"Query returned {row_count} rows")
+            
+            if fetched_metadata is not None:
+                metadata = fetched_metadata.result()
+                save_cached_metadata(project_id, metadata)
+            else:
+                logger.info(f"Using cached dataset and table metadata from {metadata_cache_path(project_id)}")
         
-        logger.info("Testing list_datasets...")
-        datasets = list(client.list_datasets())
+        datasets = metadata["datasets"]
         logger.info(f"Found {len(datasets)} datasets:")
-        for dataset in datasets[:5]:  # Show first 5 datasets
-            logger.info(f"- {dataset.dataset_id}")
+        for dataset_id in datasets[:5]:  # Show first 5 datasets
+            logger.info(f"- {dataset_id}")
         
-        if datasets:
-            dataset_id = datasets[0].dataset_id
-            tables = list(client.list_tables(dataset_id))
-            
-            if tables:
-                table_id = tables[0].table_id
-                logger.info(f"Testing get_table_schema for {dataset_id}.{table_id}...")
-                
-                table = client.get_table(f"{dataset_id}.{table_id}")
-                logger.info(f"Table schema has {len(table.schema)} fields")
-                for field in table.schema[:5]:  # Show first 5 fields
-                    logger.info(f"- {field.name} ({field.field_type})")
+        table = metadata["table"]
+        if table:
+            logger.info(f"Table {table['dataset_id']}.{table['table_id']} schema has {len(table['schema'])} fields")
+            for name, field_type in table["schema"][:5]:  # Show first 5 fields
+                logger.info(f"- {name} ({field_type})")
         
         logger.info("Test completed successfully!")
         return True
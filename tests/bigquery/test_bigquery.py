@@ -35,83 +35,109 @@ except Exception as e:
     sys.exit(1)
 
 async def test_bigquery_operations():
-    """Test BigQuery operations using the MCP client."""
-    from mcp import ClientSession
+    """Test BigQuery operations by calling the server's tool handlers in-process."""
+    from mcp_bigquery_server.direct_stdio import RESOURCE_NOT_FOUND, read_resource
     from mcp_bigquery_server.server import BigQueryMCPServer
     
-    logger.info("Starting MCP BigQuery server...")
+    logger.info("Creating MCP BigQuery server...")
     server = BigQueryMCPServer(
         expose_resources=True,
         http_enabled=False,
     )
     
-    server_task = asyncio.create_task(server.start())
+    # Tools are registered in the constructor, so the server is ready to take
+    # calls as soon as it exists; no transport, subprocess or startup wait needed.
+    call_tool = server.server.call_tool
     
-    await asyncio.sleep(1)
+    logger.info("Listing available tools...")
+    logger.info("Available tools: %s", list(server.tools))
     
-    client = ClientSession()
+    logger.info("Testing execute_query tool...")
+    query_result = await call_tool(
+        "execute_query",
+        {
+            "projectId": project_id,
+            "sql": "SELECT 1 as test",
+            "dryRun": True,
+        },
+    )
+    logger.info("Query result: %s", query_result)
     
-    try:
-        logger.info("Initializing connection...")
-        init_result = await client.initialize(
-            protocol_version="2025-03-26",
-            capabilities={
-                "tools": {},
-                "logging": {},
-            },
-        )
-        logger.info(f"Server info: {init_result.server_info}")
-        logger.info(f"Supported capabilities: {init_result.capabilities}")
-        
-        await client.send_initialized()
-        
-        await client.call_method(
-            "logging/setLevel",
-            params={"level": "info"},
-        )
-        
-        logger.info("Listing available tools...")
-        tools_result = await client.call_method("tools/list")
-        logger.info(f"Available tools: {[tool['name'] for tool in tools_result.get('tools', [])]}")
-        
-        logger.info("Testing execute_query tool...")
-        query_result = await client.call_method(
-            "tools/call",
-            params={
-                "name": "execute_query",
-                "args": {
-                    "projectId": project_id,
-                    "sql": "SELECT 1 as test",
-                    "dryRun": True,
-                },
-            },
-        )
-        logger.info(f"Query result: {query_result}")
-        
-        logger.info("Testing list_datasets tool...")
-        datasets_result = await client.call_method(
-            "tools/call",
-            params={
-                "name": "list_datasets",
-                "args": {
-                    "projectId": project_id,
-                },
-            },
-        )
-        logger.info(f"Datasets result: {datasets_result}")
-        
-        logger.info("Test completed successfully!")
-    except Exception as e:
-        logger.error(f"Test failed: {e}")
-        raise
-    finally:
-        await client.close()
-        
-        server_task.cancel()
-        try:
-            await server_task
-        except asyncio.CancelledError:
-            pass
+    logger.info("Testing list_datasets tool...")
+    datasets_result = await call_tool(
+        "list_datasets",
+        {
+            "projectId": project_id,
+        },
+    )
+    logger.info("Datasets result: %s", datasets_result)
+    
+    logger.info("Testing that multi-statement scripts are never reused...")
+    select_sql = "SELECT 1 AS test"
+    script_sql = "SELECT 1 AS a; SELECT 2 AS b"
+    first = await call_tool("execute_query", {"projectId": project_id, "sql": select_sql})
+    repeat = await call_tool("execute_query", {"projectId": project_id, "sql": select_sql})
+    if repeat["jobId"] != first["jobId"]:
+        raise AssertionError("A repeated SELECT within the TTL was submitted again")
+    scripts = [
+        await call_tool("execute_query", {"projectId": project_id, "sql": script_sql})
+        for _ in range(2)
+    ]
+    if scripts[0]["jobId"] == scripts[1]["jobId"]:
+        raise AssertionError(f"Script job {scripts[0]['jobId']} was reused")
+    after_script = await call_tool("execute_query", {"projectId": project_id, "sql": select_sql})
+    if after_script["jobId"] == first["jobId"]:
+        raise AssertionError("A script did not clear the reused SELECT jobs")
+    logger.info("Script jobs: %s", [script["jobId"] for script in scripts])
+    
+    logger.info("Testing resources/read on a fetch_results_chunk URI...")
+    job = await call_tool(
+        "execute_query",
+        {
+            "projectId": project_id,
+            "sql": "SELECT x FROM UNNEST(GENERATE_ARRAY(1, 10)) AS x",
+            "waitForCompletion": True,
+        },
+    )
+    chunk = await call_tool(
+        "fetch_results_chunk",
+        {
+            "jobId": job["jobId"],
+            "offset": 0,
+            "maxRows": 5,
+        },
+    )
+    uri = chunk["results"]["uri"]
+    resource = await read_resource(server.server, {"uri": uri}, 1)
+    if "error" in resource:
+        raise AssertionError(f"Reading {uri} failed: {resource['error']}")
+    contents = resource["result"]["contents"]
+    if contents[0]["uri"] != uri:
+        raise AssertionError(f"Read {contents[0]['uri']} instead of {uri}")
+    logger.info("Read %s as %s", uri, contents[0]["mimeType"])
+    
+    missing = await read_resource(server.server, {"uri": "bq://results/no-such-job/0"}, 2)
+    if missing.get("error", {}).get("code") != RESOURCE_NOT_FOUND:
+        raise AssertionError(f"Expected a resource-not-found error, got {missing}")
+    logger.info("Unknown URI rejected: %s", missing["error"]["message"])
+    
+    logger.info("Testing get_job_status on a failed job...")
+    failed_job = await call_tool(
+        "execute_query",
+        {
+            "projectId": project_id,
+            "sql": "SELECT ERROR('deliberate failure')",
+        },
+    )
+    status_params = {"jobId": failed_job["jobId"]}
+    if failed_job.get("location"):
+        status_params["location"] = failed_job["location"]
+    failed_status = await call_tool("get_job_status", status_params)
+    if failed_status["status"] != "DONE" or not failed_status["error"]:
+        raise AssertionError(f"Expected a finished job with an error, got {failed_status}")
+    logger.info("Failed job reported: %s", failed_status["error"])
+    
+    logger.info("Test completed successfully!")
 
 def main():
     """Main entry point for the test script."""
@@ -2,30 +2,13 @@
 Test script that simulates Claude Desktop's complete request sequence.
 This helps verify our server correctly handles all Claude Desktop methods.
 """
-import json
+import os
 import sys
-import time
 
-def send_request(request):
-    """Send a JSON-RPC request to the stdio server."""
-    json_str = json.dumps(request)
-    print(f"Sending request: {json_str}", file=sys.stderr)
-    print(json_str, flush=True)
-    time.sleep(1)  # Give the server time to process
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../utils"))
+from stdio_client import initialize_request, send_request, tools_call_request, tools_list_request
 
-initialize_request = {
-    "jsonrpc": "2.0",
-    "method": "initialize",
-    "params": {
-        "protocolVersion": "2024-11-05",
-        "capabilities": {},
-        "clientInfo": {
-            "name": "claude-ai",
-            "version": "0.1.0"
-        }
-    },
-    "id": 0
-}
+init_request = initialize_request(0)
 
 notification_initialized = {
     "jsonrpc": "2.0",
@@ -39,12 +22,7 @@ resources_list_request = {
     "id": 1
 }
 
-tools_list_request = {
-    "jsonrpc": "2.0",
-    "method": "tools/list",
-    "params": {},
-    "id": 2
-}
+list_request = tools_list_request(2)
 
 prompts_list_request = {
     "jsonrpc": "2.0",
@@ -53,44 +31,23 @@ prompts_list_request = {
     "id": 3
 }
 
-tools_call_request = {
-    "jsonrpc": "2.0",
-    "method": "tools/call",
-    "params": {
-        "name": "list_datasets",
-        "arguments": {
-            "projectId": "query-management-and-answering"
-        }
-    },
-    "id": 4
-}
+call_request = tools_call_request(4, "list_datasets", {
+    "projectId": "query-management-and-answering"
+})
 
-tools_call_query_request = {
-    "jsonrpc": "2.0",
-    "method": "tools/call",
-    "params": {
-        "name": "execute_query",
-        "arguments": {
-            "projectId": "query-management-and-answering",
-            "sql": "SELECT 1 as test",
-            "dryRun": True
-        }
-    },
-    "id": 5
-}
+tools_call_query_request = tools_call_request(5, "execute_query", {
+    "projectId": "query-management-and-answering",
+    "sql": "SELECT 1 as test",
+    "dryRun": True
+})
 
 if __name__ == "__main__":
     print("Testing MCP BigQuery server with complete Claude Desktop sequence...", file=sys.stderr)
-    send_request(initialize_request)
+    send_request(init_request)
     send_request(notification_initialized)
     send_request(resources_list_request)
-    send_request(tools_list_request)
+    send_request(list_request)
     send_request(prompts_list_request)
-    send_request(tools_call_request)
+    send_request(call_request)
     send_request(tools_call_query_request)
     print("Test completed", file=sys.stderr)
-    try:
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        print("Test terminated by user.", file=sys.stderr)
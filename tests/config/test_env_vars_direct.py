@@ -4,7 +4,15 @@ This script checks if environment variables are correctly passed to the server.
 """
 import os
 import sys
-import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../utils"))
+from stdio_client import (
+    initialize_request,
+    send_batch,
+    send_request,
+    tools_call_request,
+    tools_list_request,
+)
 
 def main():
     """Print environment variables and send a test query."""
@@ -13,55 +21,15 @@ def main():
     print(f"LOCATION: {os.environ.get('LOCATION', 'Not set')}", file=sys.stderr)
     print(f"GOOGLE_APPLICATION_CREDENTIALS: {os.environ.get('GOOGLE_APPLICATION_CREDENTIALS', 'Not set')}", file=sys.stderr)
     
-    initialize_request = {
-        "jsonrpc": "2.0",
-        "method": "initialize",
-        "params": {
-            "protocolVersion": "2024-11-05",
-            "capabilities": {},
-            "clientInfo": {
-                "name": "claude-ai",
-                "version": "0.1.0"
-            }
-        },
-        "id": 1
-    }
-    print(json.dumps(initialize_request), flush=True)
-    
-    tools_list_request = {
-        "jsonrpc": "2.0",
-        "method": "tools/list",
-        "params": {},
-        "id": 2
-    }
-    print(json.dumps(tools_list_request), flush=True)
+    init_request = initialize_request(1)
+    send_request(init_request)
     
-    execute_query_request = {
-        "jsonrpc": "2.0",
-        "method": "tools/call",
-        "params": {
-            "name": "execute_query",
-            "arguments": {
-                "sql": "SELECT 1 as test"
-            }
-        },
-        "id": 3
-    }
-    print(json.dumps(execute_query_request), flush=True)
+    list_request = tools_list_request(2)
     
-    print("Test script is running. Press Ctrl+C to exit.", file=sys.stderr)
-    try:
-        while True:
-            line = sys.stdin.readline()
-            if not line:
-                break
-            try:
-                response = json.loads(line)
-                print(f"Received response: {json.dumps(response)}", file=sys.stderr)
-            except json.JSONDecodeError:
-                print(f"Received non-JSON response: {line}", file=sys.stderr)
-    except KeyboardInterrupt:
-        print("Test terminated by user.", file=sys.stderr)
+    execute_query_request = tools_call_request(3, "execute_query", {
+        "sql": "SELECT 1 as test"
+    })
+    send_batch([list_request, execute_query_request])
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,7 @@
 """
 Test script to verify improved credential handling in the BigQuery MCP server.
 """
+import functools
 import os
 import sys
 import json
@@ -24,6 +25,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger("test-credentials")
 
+@functools.lru_cache(maxsize=1)
+def _get_credentials(creds_path):
+    """Load the service account credentials once for all tests."""
+    return load_credentials_from_file(creds_path)
+
+@functools.lru_cache(maxsize=None)
+def _get_client(creds_path, project=None):
+    """Build one BigQuery client per project, sharing the loaded credentials."""
+    return bigquery.Client(project=project, credentials=_get_credentials(creds_path))
+
 def test_load_credentials():
     """Test loading credentials from file."""
     logger.info("Testing credential loading...")
@@ -36,14 +47,11 @@ def test_load_credentials():
         return False
     
     try:
-        credentials = load_credentials_from_file(creds_path)
+        credentials = _get_credentials(creds_path)
         logger.info(f"Successfully loaded credentials for: {credentials.service_account_email}")
         logger.info(f"Project ID from credentials: {credentials.project_id}")
         
-        client = bigquery.Client(
-            project=credentials.project_id,
-            credentials=credentials,
-        )
+        client = _get_client(creds_path, credentials.project_id)
         logger.info(f"Successfully created BigQuery client for project: {client.project}")
         
         query_job = client.query("SELECT 1 as test")
@@ -70,9 +78,11 @@ def test_project_id_fallback():
             logger.error("No credentials path found in environment variables")
             return False
         
-        credentials = load_credentials_from_file(creds_path)
+        credentials = _get_credentials(creds_path)
         
-        client = bigquery.Client(credentials=credentials)
+        # No project is passed, so the client has to fall back to the
+        # credentials' project; it still reuses the loaded credentials.
+        client = _get_client(creds_path)
         
         logger.info(f"Project ID from credentials: {credentials.project_id}")
         logger.info(f"Project ID used by client: {client.project}")
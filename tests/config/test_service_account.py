@@ -3,19 +3,19 @@ Test script to verify service account access to the amazon-study-db project.
 """
 import os
 import sys
-from google.cloud import bigquery
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../utils"))
+from bq_client import KEY_FILE, PROJECT_ID, cached_query, get_client
 
 def main():
-    key_file_path = os.path.expanduser("~/attachments/64ba55d6-602f-4772-9884-0619feefa042/amazon-study-db-c6ecbc10001a.json")
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = key_file_path
-    
-    project_id = "amazon-study-db"
+    key_file_path = KEY_FILE
+    project_id = PROJECT_ID
     
     print(f"Testing access to project: {project_id}")
     print(f"Using service account key: {key_file_path}")
     
     try:
-        client = bigquery.Client(project=project_id)
+        client = get_client(project_id, key_file_path)
         
         print("\nListing datasets:")
         datasets = list(client.list_datasets())
@@ -28,10 +28,9 @@ def main():
         
         print("\nExecuting a simple query:")
         query = "SELECT 1 as test"
-        query_job = client.query(query)
-        results = query_job.result()
+        results = cached_query(client, query)
         for row in results:
-            print(f"Query result: {row.test}")
+            print(f"Query result: {row['test']}")
         
         print("\nExecuting INFORMATION_SCHEMA query:")
         info_schema_query = "SELECT * FROM `region-us`.INFORMATION_SCHEMA.DATASETS LIMIT 5"
@@ -41,15 +40,14 @@ def main():
         print(f"Transformed query: {transformed_query}")
         
         try:
-            query_job = client.query(transformed_query)
-            results = query_job.result()
+            results = cached_query(client, transformed_query)
             
             print("\nINFORMATION_SCHEMA query results:")
             row_count = 0
             for row in results:
                 row_count += 1
                 if row_count <= 3:  # Only print first 3 rows
-                    print(f"- Dataset: {row.dataset_id if hasattr(row, 'dataset_id') else str(row)}")
+                    print(f"- Dataset: {row.get('dataset_id', row)}")
             
             if row_count > 3:
                 print(f"... and {row_count - 3} more datasets")
@@ -60,8 +58,7 @@ def main():
             
             print("\nTrying original query to demonstrate the error:")
             try:
-                query_job = client.query(info_schema_query)
-                results = query_job.result()
+                results = cached_query(client, info_schema_query)
                 print("Original query unexpectedly succeeded")
             except Exception as e:
                 print(f"Original query error: {e}")
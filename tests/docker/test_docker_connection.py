@@ -1,13 +1,17 @@
 import requests
 import json
 
+# One keep-alive session for every call, so later requests reuse the connection.
+_session = requests.Session()
+_session.headers.update({"Content-Type": "application/json"})
+
 def test_mcp_server():
     """Test the MCP server running in Docker."""
     url = "http://localhost:8000/mcp"
     
     try:
         print("Testing GET endpoint...")
-        response = requests.get(url)
+        response = _session.get(url)
         print(f"GET Status code: {response.status_code}")
         print(f"GET Response: {response.text}")
     except Exception as e:
@@ -27,13 +31,9 @@ def test_mcp_server():
         "id": 1
     }
     
-    headers = {
-        "Content-Type": "application/json"
-    }
-    
     try:
         print("\nTesting execute_query tool...")
-        response = requests.post(url, json=payload, headers=headers)
+        response = _session.post(url, json=payload)
         print(f"POST Status code: {response.status_code}")
         print(f"POST Response text: {response.text}")
         
@@ -52,7 +52,7 @@ def test_mcp_server():
                 "id": 2
             }
             
-            response = requests.post(url, json=payload, headers=headers)
+            response = _session.post(url, json=payload)
             print(f"\nList datasets status code: {response.status_code}")
             print(f"List datasets response text: {response.text}")
             
@@ -66,5 +66,6 @@ def test_mcp_server():
 
 if __name__ == "__main__":
     print("Testing MCP BigQuery server in Docker...")
-    success = test_mcp_server()
+    with _session:
+        success = test_mcp_server()
     print(f"\nTest {'succeeded' if success else 'failed'}")
@@ -2,145 +2,247 @@
 """
 Test script for the MCP BigQuery server running in Docker with stdio transport.
 This script tests if the Docker container stays alive when using stdio transport.
+
+One container serves the whole session: initialize, tools/list and the tool
+call all go through its stdio streams. Do not start a container per request
+(e.g. `docker run -i ... | cmd` for each call); container startup dominates
+the cost of a request.
+
+With the docker Python SDK installed (pip install docker) the image is built and
+the container driven through the Docker Engine API; otherwise the docker CLI is used.
 """
-import json
+import datetime
+import re
 import subprocess
 import sys
-import time
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional
+
+try:
+    import docker
+    from docker.utils.socket import frames_iter
+except ImportError:
+    docker = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../utils"))
+from stdio_client import StdioClient, call_tool_request, initialize_request, tools_list_request
+
+IMAGE_TAG = "mcp-bigquery-server"
+KEY_FILE = "query-management-and-answering-16941c344903.json"
+
+# Files and directories the Dockerfile copies into the image.
+BUILD_INPUTS = ("Dockerfile", "pyproject.toml", "poetry.lock", "README.md", "docker-entrypoint.sh", "src")
+
+def _build_inputs_mtime() -> float:
+    """Return the newest modification time among the image's build inputs."""
+    mtimes = []
+    for path in BUILD_INPUTS:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                mtimes.extend(os.path.getmtime(os.path.join(root, name)) for name in files)
+        elif os.path.exists(path):
+            mtimes.append(os.path.getmtime(path))
+    return max(mtimes, default=0.0)
+
+def image_is_current(created: str) -> bool:
+    """
+    Tell whether an image created at the given time is newer than every build input.
+
+    Args:
+        created: The image's Created timestamp as Docker reports it (RFC 3339,
+            possibly with nanoseconds)
+    """
+    created = re.sub(r"(\.\d{6})\d+", r"\1", created.strip()).replace("Z", "+00:00")
+    return datetime.datetime.fromisoformat(created).timestamp() > _build_inputs_mtime()
+
+# Buffer size for the pipes to the docker CLI. stderr is only read on failure,
+# so a larger pipe keeps the server's logging from filling it and stalling.
+PIPE_BUFFER_SIZE = 1 << 20
+
+def _grow_pipes(*streams) -> None:
+    """Raise the kernel capacity of the given pipes to PIPE_BUFFER_SIZE on Linux."""
+    if not sys.platform.startswith("linux"):
+        return
+    import fcntl
+    F_SETPIPE_SZ = getattr(fcntl, "F_SETPIPE_SZ", 1031)
+    for stream in streams:
+        try:
+            fcntl.fcntl(stream.fileno(), F_SETPIPE_SZ, PIPE_BUFFER_SIZE)
+        except OSError:
+            # Above /proc/sys/fs/pipe-max-size; keep the default capacity.
+            pass
+
+class CliContainer:
+    """Server container started with the docker CLI, talking over the process pipes."""
+
+    def __init__(self):
+        inspect = subprocess.run(
+            ["docker", "image", "inspect", "--format={{.Created}}", IMAGE_TAG],
+            capture_output=True,
+            text=True,
+        )
+        if inspect.returncode == 0 and image_is_current(inspect.stdout):
+            print("Docker image is up to date, skipping build.")
+        else:
+            print("Building Docker image...")
+            subprocess.run(["docker", "build", "-t", IMAGE_TAG, "."], check=True)
+        
+        print("Starting Docker container with stdio transport...")
+        self._process = subprocess.Popen(
+            [
+                "docker", "run", "-i", "--rm",
+                "-v", f"{os.path.abspath('credentials')}:/credentials",
+                "-e", f"GOOGLE_APPLICATION_CREDENTIALS=/credentials/{KEY_FILE}",
+                IMAGE_TAG,
+                "--stdio"
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=PIPE_BUFFER_SIZE,
+        )
+        _grow_pipes(self._process.stdin, self._process.stdout, self._process.stderr)
+        self.client = StdioClient(self._process.stdin, self._process.stdout)
+
+    def exit_code(self) -> Optional[int]:
+        """Return the container's exit code, or None while it is running."""
+        return self._process.poll()
+
+    def stderr(self) -> str:
+        self._process.terminate()
+        return self._process.stderr.read()
+
+    def stop(self) -> None:
+        self._process.terminate()
+        self._process.wait(timeout=5)
+
+class _SocketWriter:
+    """Binary stream facade over the attached socket for StdioClient's requests."""
+
+    def __init__(self, sock):
+        self._sock = sock
+
+    def write(self, data: bytes) -> None:
+        self._sock.sendall(data)
+
+    def flush(self) -> None:
+        pass
+
+def _socket_lines(sock) -> Iterator[str]:
+    """Yield the container's stdout line by line from the multiplexed attach stream."""
+    buffer = b""
+    for _, data in frames_iter(sock, False):
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode()
+
+class SdkContainer:
+    """Server container driven through the Docker Engine API, talking over an attached socket."""
+
+    def __init__(self):
+        engine = docker.from_env()
+        
+        try:
+            image = engine.images.get(IMAGE_TAG)
+        except docker.errors.ImageNotFound:
+            image = None
+        if image is not None and image_is_current(image.attrs["Created"]):
+            print("Docker image is up to date, skipping build.")
+        else:
+            print("Building Docker image...")
+            # The low-level build endpoint streams progress, so a failing step
+            # stops the test as soon as Docker reports it.
+            for chunk in engine.api.build(path=".", tag=IMAGE_TAG, rm=True, decode=True):
+                if "error" in chunk:
+                    raise RuntimeError(f"Docker build failed: {chunk['error']}")
+                if "stream" in chunk:
+                    print(chunk["stream"], end="")
+            image = engine.images.get(IMAGE_TAG)
+        
+        print("Starting Docker container with stdio transport...")
+        self._container = engine.containers.run(
+            image.id,
+            command=["--stdio"],
+            volumes={os.path.abspath("credentials"): {"bind": "/credentials", "mode": "ro"}},
+            environment={"GOOGLE_APPLICATION_CREDENTIALS": f"/credentials/{KEY_FILE}"},
+            stdin_open=True,
+            detach=True,
+        )
+        sock = self._container.attach_socket(params={"stdin": 1, "stdout": 1, "stream": 1})
+        raw = getattr(sock, "_sock", sock)
+        self.client = StdioClient(_SocketWriter(raw), _socket_lines(raw))
+
+    def exit_code(self) -> Optional[int]:
+        """Return the container's exit code, or None while it is running."""
+        self._container.reload()
+        if self._container.status == "running":
+            return None
+        return self._container.attrs["State"]["ExitCode"]
+
+    def stderr(self) -> str:
+        return self._container.logs(stdout=False, stderr=True).decode()
+
+    def stop(self) -> None:
+        self._container.remove(force=True)
+
+def send_request(container, request: Dict[str, Any]) -> Dict[str, Any]:
+    """Send a request to the container and wait for its response, exiting if none arrives."""
+    try:
+        return container.client.send_request(request)
+    except (EOFError, TimeoutError) as e:
+        print(f"Error: {e}")
+        print(f"Container stderr: {container.stderr()}")
+        container.stop()
+        sys.exit(1)
+
+def check_running(container, step: str) -> None:
+    """Exit with the container's stderr if it is no longer running."""
+    exit_code = container.exit_code()
+    if exit_code is not None:
+        print(f"Error: Container exited after {step} request with code {exit_code}")
+        print(f"Container stderr: {container.stderr()}")
+        container.stop()
+        sys.exit(1)
 
 def main():
     """Run the test."""
     print("Testing MCP BigQuery server in Docker with stdio transport...")
     
     # Check if credentials exist
-    credentials_path = os.path.join(os.getcwd(), "credentials", "query-management-and-answering-16941c344903.json")
+    credentials_path = os.path.join(os.getcwd(), "credentials", KEY_FILE)
     if not os.path.exists(credentials_path):
         print(f"Error: Credentials file not found at {credentials_path}")
         print("Please make sure to copy the service account key to the credentials directory.")
         sys.exit(1)
     
-    # Build the Docker image
-    print("Building Docker image...")
-    subprocess.run(
-        ["docker", "build", "-t", "mcp-bigquery-server", "."],
-        check=True,
-    )
+    container = SdkContainer() if docker is not None else CliContainer()
     
-    # Start the Docker container with stdio transport
-    print("Starting Docker container with stdio transport...")
-    process = subprocess.Popen(
-        [
-            "docker", "run", "-i", "--rm",
-            "-v", f"{os.path.abspath('credentials')}:/credentials",
-            "-e", "GOOGLE_APPLICATION_CREDENTIALS=/credentials/query-management-and-answering-16941c344903.json",
-            "mcp-bigquery-server",
-            "--stdio"
-        ],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-    )
+    print("Container started.")
     
-    # Give the container time to start
-    time.sleep(2)
+    init_request = initialize_request(1)
     
-    # Check if the container is still running
-    if process.poll() is not None:
-        print(f"Error: Container exited with code {process.poll()}")
-        stderr = process.stderr.read()
-        print(f"Container stderr: {stderr}")
-        sys.exit(1)
-    
-    print("Container is running. Sending initialize request...")
-    
-    # Send initialize request (like Claude Desktop would)
-    initialize_request = {
-        "jsonrpc": "2.0",
-        "method": "initialize",
-        "params": {
-            "protocolVersion": "2024-11-05",
-            "capabilities": {},
-            "clientInfo": {
-                "name": "claude-ai",
-                "version": "0.1.0"
-            }
-        },
-        "id": 1
-    }
+    list_tools_request = tools_list_request(2)
     
-    process.stdin.write(json.dumps(initialize_request) + "\n")
-    process.stdin.flush()
-    
-    # Wait for response
-    time.sleep(2)
-    
-    # Check if the container is still running after initialize
-    if process.poll() is not None:
-        print(f"Error: Container exited after initialize request with code {process.poll()}")
-        stderr = process.stderr.read()
-        print(f"Container stderr: {stderr}")
-        sys.exit(1)
+    datasets_request = call_tool_request(3, "list_datasets", {
+        "projectId": "query-management-and-answering"
+    })
     
-    print("Container is still running after initialize request. Sending tools/list request...")
-    
-    # Send tools/list request
-    list_tools_request = {
-        "jsonrpc": "2.0",
-        "method": "tools/list",
-        "id": 2
-    }
-    
-    process.stdin.write(json.dumps(list_tools_request) + "\n")
-    process.stdin.flush()
-    
-    # Wait for response
-    time.sleep(2)
-    
-    # Check if the container is still running after tools/list
-    if process.poll() is not None:
-        print(f"Error: Container exited after tools/list request with code {process.poll()}")
-        stderr = process.stderr.read()
-        print(f"Container stderr: {stderr}")
-        sys.exit(1)
-    
-    print("Container is still running after tools/list request. Sending call_tool request...")
-    
-    # Send call_tool request
-    call_tool_request = {
-        "jsonrpc": "2.0",
-        "method": "call_tool",
-        "params": {
-            "tool": "list_datasets",
-            "params": {
-                "projectId": "query-management-and-answering"
-            }
-        },
-        "id": 3
-    }
-    
-    process.stdin.write(json.dumps(call_tool_request) + "\n")
-    process.stdin.flush()
-    
-    # Wait for response
-    time.sleep(2)
-    
-    # Check if the container is still running after call_tool
-    if process.poll() is not None:
-        print(f"Error: Container exited after call_tool request with code {process.poll()}")
-        stderr = process.stderr.read()
-        print(f"Container stderr: {stderr}")
-        sys.exit(1)
+    # Every request goes to the same container over the same stdio session,
+    # like Claude Desktop; the container must survive each one.
+    for request in (init_request, list_tools_request, datasets_request):
+        step = request["method"]
+        print(f"Sending {step} request...")
+        send_request(container, request)
+        check_running(container, step)
+        print(f"Container is still running after {step} request.")
     
-    print("Container is still running after call_tool request.")
     print("\n✅ Test passed! The Docker container stays alive with stdio transport.")
     
     # Clean up
     print("Terminating container...")
-    process.terminate()
-    process.wait(timeout=5)
+    container.stop()
     
     return True
 
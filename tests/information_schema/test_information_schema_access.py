@@ -4,91 +4,48 @@ Based on BigQuery documentation for INFORMATION_SCHEMA access patterns.
 """
 import os
 import sys
-from google.cloud import bigquery
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../utils"))
+from bq_client import KEY_FILE, PROJECT_ID, get_client, run_probes
 
 def main():
-    key_file_path = os.path.expanduser("~/attachments/64ba55d6-602f-4772-9884-0619feefa042/amazon-study-db-c6ecbc10001a.json")
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = key_file_path
-    
-    project_id = "amazon-study-db"
+    key_file_path = KEY_FILE
+    project_id = PROJECT_ID
     
     print(f"Testing INFORMATION_SCHEMA access patterns for project: {project_id}")
     print(f"Using service account key: {key_file_path}")
     
     try:
-        client = bigquery.Client(project=project_id)
-        
-        print("\nListing datasets:")
-        datasets = list(client.list_datasets())
-        if datasets:
-            print(f"Found {len(datasets)} datasets in project {project_id}:")
-            for dataset in datasets:
-                print(f"- {dataset.dataset_id}")
+        client = get_client(project_id, key_file_path)
+        
+        # Approach 5 only needs one dataset, so stop after the first page
+        # instead of walking the project's whole dataset listing.
+        print("\nLooking up a dataset:")
+        first_dataset = next(iter(client.list_datasets(max_results=1)), None)
+        if first_dataset:
+            print(f"- {first_dataset.dataset_id}")
         else:
             print(f"No datasets found in project {project_id}")
         
-        
-        print("\nApproach 1: Project-level INFORMATION_SCHEMA")
-        query1 = f"SELECT * FROM `{project_id}`.INFORMATION_SCHEMA.SCHEMATA LIMIT 5"
-        print(f"Query: {query1}")
-        try:
-            query_job = client.query(query1)
-            results = list(query_job.result())
-            print(f"Success! Found {len(results)} results")
-            if results:
-                print("First result:", results[0])
-        except Exception as e:
-            print(f"Error: {e}")
-        
-        print("\nApproach 2: Region-level INFORMATION_SCHEMA")
-        query2 = f"SELECT * FROM `{project_id}`.`region-us`.INFORMATION_SCHEMA.SCHEMATA LIMIT 5"
-        print(f"Query: {query2}")
-        try:
-            query_job = client.query(query2)
-            results = list(query_job.result())
-            print(f"Success! Found {len(results)} results")
-            if results:
-                print("First result:", results[0])
-        except Exception as e:
-            print(f"Error: {e}")
-        
-        print("\nApproach 3: Using location parameter")
-        query3 = "SELECT * FROM INFORMATION_SCHEMA.SCHEMATA LIMIT 5"
-        print(f"Query: {query3} (with location='us')")
-        try:
-            query_job = client.query(query3, location="us")
-            results = list(query_job.result())
-            print(f"Success! Found {len(results)} results")
-            if results:
-                print("First result:", results[0])
-        except Exception as e:
-            print(f"Error: {e}")
-        
-        print("\nApproach 4: Using DATASETS with location parameter")
-        query4 = "SELECT * FROM INFORMATION_SCHEMA.DATASETS LIMIT 5"
-        print(f"Query: {query4} (with location='us')")
-        try:
-            query_job = client.query(query4, location="us")
-            results = list(query_job.result())
-            print(f"Success! Found {len(results)} results")
-            if results:
-                print("First result:", results[0])
-        except Exception as e:
-            print(f"Error: {e}")
-        
-        if datasets:
-            dataset_id = datasets[0].dataset_id
-            print(f"\nApproach 5: Dataset-specific INFORMATION_SCHEMA for {dataset_id}")
-            query5 = f"SELECT * FROM `{project_id}.{dataset_id}`.INFORMATION_SCHEMA.TABLES LIMIT 5"
-            print(f"Query: {query5}")
-            try:
-                query_job = client.query(query5)
-                results = list(query_job.result())
-                print(f"Success! Found {len(results)} results")
-                if results:
-                    print("First result:", results[0])
-            except Exception as e:
-                print(f"Error: {e}")
+        approaches = [
+            ("Approach 1: Project-level INFORMATION_SCHEMA",
+             f"SELECT * FROM `{project_id}`.INFORMATION_SCHEMA.SCHEMATA LIMIT 5", None),
+            ("Approach 2: Region-level INFORMATION_SCHEMA",
+             f"SELECT * FROM `{project_id}`.`region-us`.INFORMATION_SCHEMA.SCHEMATA LIMIT 5", None),
+            ("Approach 3: Using location parameter",
+             "SELECT * FROM INFORMATION_SCHEMA.SCHEMATA LIMIT 5", "us"),
+            ("Approach 4: Using DATASETS with location parameter",
+             "SELECT * FROM INFORMATION_SCHEMA.DATASETS LIMIT 5", "us"),
+        ]
+        if first_dataset:
+            dataset_id = first_dataset.dataset_id
+            approaches.append((
+                f"Approach 5: Dataset-specific INFORMATION_SCHEMA for {dataset_id}",
+                f"SELECT * FROM `{project_id}.{dataset_id}`.INFORMATION_SCHEMA.TABLES LIMIT 5",
+                None,
+            ))
+        
+        run_probes(client, approaches)
         
         return True
         
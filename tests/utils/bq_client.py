@@ -0,0 +1,180 @@
+"""
+Shared BigQuery client for the test scripts.
+
+Building a client parses credentials and sets up an authorized HTTP
+session, so scripts fetch it through get_client and reuse it for every
+query instead of constructing their own. Service account keys are passed
+in explicitly and parsed once, rather than routed through
+GOOGLE_APPLICATION_CREDENTIALS. The session gets the server's
+enlarged connection pool, so queries run side by side each keep a
+connection open instead of redoing the TLS handshake.
+
+Query rows are read as Arrow record batches over the BigQuery Storage Read API
+when google-cloud-bigquery-storage and pyarrow are installed, and over the REST
+API otherwise.
+"""
+import concurrent.futures
+import functools
+import os
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import google.auth
+from google.cloud import bigquery
+from google.oauth2 import service_account
+
+try:
+    from google.cloud import bigquery_storage
+    import pyarrow  # noqa: F401  (needed by RowIterator.to_arrow_iterable)
+except ImportError:
+    bigquery_storage = None
+
+# Service account key and project the direct INFORMATION_SCHEMA scripts run against.
+KEY_FILE = os.path.expanduser(
+    "~/attachments/64ba55d6-602f-4772-9884-0619feefa042/amazon-study-db-c6ecbc10001a.json"
+)
+PROJECT_ID = "amazon-study-db"
+
+# Results with more rows than this are returned but not kept in the query cache.
+QUERY_CACHE_MAX_ROWS = 10_000
+
+_query_cache: Dict[Tuple[bigquery.Client, str, Optional[str]], List[Any]] = {}
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../src"))
+from mcp_bigquery_server.env_utils import create_authorized_session
+
+@functools.lru_cache(maxsize=4)
+def get_credentials(key_file: Optional[str] = None):
+    """Load a service account key, or Application Default Credentials when key_file is None."""
+    if key_file:
+        return service_account.Credentials.from_service_account_file(
+            key_file, scopes=bigquery.Client.SCOPE
+        )
+    credentials, _ = google.auth.default(scopes=bigquery.Client.SCOPE)
+    return credentials
+
+@functools.lru_cache(maxsize=4)
+def get_client(project_id: str, key_file: Optional[str] = None) -> bigquery.Client:
+    """Return the client for a project and key file, creating it on first use."""
+    credentials = get_credentials(key_file)
+    return bigquery.Client(
+        project=project_id,
+        credentials=credentials,
+        _http=create_authorized_session(credentials),
+    )
+
+@functools.lru_cache(maxsize=4)
+def get_bqstorage_client(client: bigquery.Client) -> Optional[Any]:
+    """Return a Storage read client on a client's credentials, or None when it is not installed."""
+    if bigquery_storage is None:
+        return None
+    return bigquery_storage.BigQueryReadClient(credentials=client._credentials)
+
+def iter_rows(results, bqstorage_client) -> Iterator[Any]:
+    """
+    Yield result rows, reading Arrow record batches over the Storage Read API when a client is given.
+
+    Rows come back as dicts from Arrow and as bigquery.Row over REST; index
+    them by column name (row["name"], row.get("name")), which works for both.
+    """
+    if bqstorage_client is not None:
+        yielded = False
+        try:
+            for batch in results.to_arrow_iterable(bqstorage_client=bqstorage_client):
+                for row in batch.to_pylist():
+                    yielded = True
+                    yield row
+            return
+        except Exception as e:
+            if yielded:
+                raise
+            print(f"Storage Read API unavailable, reading rows over REST: {e}", file=sys.stderr)
+    yield from results
+
+def normalize_sql(sql: str) -> str:
+    """
+    Strip surrounding whitespace and trailing semicolons from a query.
+
+    BigQuery's result cache is keyed on the exact query text, so the same
+    query written with or without a final ";" or newline would otherwise
+    miss it. Whitespace inside the query is left alone, since it may be part
+    of a string literal.
+    """
+    return sql.strip().rstrip(";").rstrip()
+
+def cached_query(client: bigquery.Client, sql: str, location: Optional[str] = None) -> List[Any]:
+    """
+    Run a query and return its rows, reusing the rows of an identical earlier query.
+
+    Several scripts probe the same INFORMATION_SCHEMA views, so results are
+    kept for the life of the process, keyed on the client, the normalized SQL
+    and the location. Failed queries are not cached. The normalized SQL is
+    also what is sent, so repeats across runs can hit BigQuery's own cache.
+    """
+    sql = normalize_sql(sql)
+    key = (client, sql, location)
+    rows = _query_cache.get(key)
+    if rows is None:
+        job_config = bigquery.QueryJobConfig(use_query_cache=True)
+        results = client.query(sql, job_config=job_config, location=location).result()
+        rows = list(iter_rows(results, get_bqstorage_client(client)))
+        if len(rows) <= QUERY_CACHE_MAX_ROWS:
+            _query_cache[key] = rows
+    return rows
+
+def dry_run_query(client: bigquery.Client, sql: str, location: Optional[str] = None) -> int:
+    """
+    Validate a query without running it and return the bytes it would process.
+
+    A dry run checks syntax, references and permissions without executing
+    anything, so it answers "is this form accepted?" far faster than a real
+    query and bills nothing.
+    """
+    job_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+    return client.query(sql, job_config=job_config, location=location).total_bytes_processed
+
+def run_probes(
+    client: bigquery.Client, probes: List[Tuple[str, str, Optional[str]]], sample_rows: int = 3
+) -> List[str]:
+    """
+    Check which of several query forms BigQuery accepts and print a report.
+
+    Every probe is a (label, query, location) tuple. All of them are dry-run
+    at once and reported in order; the first accepted one is then run for
+    real and only its first sample_rows rows are fetched.
+
+    Returns:
+        Labels of the accepted probes
+    """
+    accepted = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(len(probes), 1)) as executor:
+        futures = [
+            executor.submit(dry_run_query, client, query, location)
+            for _, query, location in probes
+        ]
+        for (label, query, location), future in zip(probes, futures):
+            print(f"\n{label}")
+            if location:
+                print(f"Query: {query} (with location='{location}')")
+            else:
+                print(f"Query: {query}")
+            try:
+                bytes_processed = future.result()
+                print(f"Success! Query would process {bytes_processed} bytes")
+                accepted.append((label, query, location))
+            except Exception as e:
+                print(f"Error: {e}")
+
+    if accepted:
+        label, query, location = accepted[0]
+        print(f"\nSample results from {label}")
+        try:
+            # Fetch only the sample rows; the total comes from the job's statistics.
+            results = client.query(normalize_sql(query), location=location).result(max_results=sample_rows)
+            print(f"Found {results.total_rows} results")
+            for row in results:
+                print(f"- {row}")
+        except Exception as e:
+            print(f"Error: {e}")
+
+    return [label for label, _, _ in accepted]
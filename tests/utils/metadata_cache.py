@@ -0,0 +1,33 @@
+"""
+On-disk cache of BigQuery dataset and table metadata for the test scripts.
+
+Dataset listings and table schemas rarely change between test runs, so the
+scripts keep what they fetched in a per-project JSON file under the system
+temp directory and reuse it for a day. Delete the file to force a refresh.
+"""
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# How long cached metadata is reused before it is fetched again.
+METADATA_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+def metadata_cache_path(project_id: str) -> Path:
+    """Return the cache file used for a project."""
+    return Path(tempfile.gettempdir()) / f"bq_meta_{project_id}.json"
+
+def load_cached_metadata(project_id: str) -> Optional[Dict[str, Any]]:
+    """Return the cached metadata for a project, or None if it is missing, stale or unreadable."""
+    path = metadata_cache_path(project_id)
+    try:
+        if time.time() - path.stat().st_mtime >= METADATA_CACHE_TTL_SECONDS:
+            return None
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+def save_cached_metadata(project_id: str, metadata: Dict[str, Any]) -> None:
+    """Write a project's metadata to its cache file."""
+    metadata_cache_path(project_id).write_text(json.dumps(metadata))
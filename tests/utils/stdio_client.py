@@ -0,0 +1,241 @@
+"""
+JSON-RPC client helpers for the stdio test scripts.
+
+The scripts write requests to stdout and read the server's responses from stdin,
+waiting for each response by id instead of sleeping a fixed time. The server's
+stdout therefore has to be fed back into the script, for example through a FIFO:
+
+    mkfifo /tmp/mcp-responses
+    python tests/claude_desktop/test_claude_desktop_tools_call.py < /tmp/mcp-responses \
+        | python -m mcp_bigquery_server --stdio > /tmp/mcp-responses
+"""
+import json
+import sys
+import threading
+from typing import Any, BinaryIO, Dict, List, Optional, TextIO, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# How long to wait for the response to one request before giving up.
+RESPONSE_TIMEOUT_SECONDS = 30
+
+def _dumps(obj: Any) -> bytes:
+    """
+    Encode a request to compact UTF-8 JSON, with orjson when it is installed.
+
+    The json fallback uses the same separators as orjson, so the bytes on the
+    wire are identical either way.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+def _loads(data: str) -> Any:
+    """Decode a response line, with orjson when it is installed; both raise json.JSONDecodeError."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def initialize_request(request_id: Any) -> Dict[str, Any]:
+    """Build the initialize request Claude Desktop sends first."""
+    return {
+        "jsonrpc": "2.0",
+        "method": "initialize",
+        "params": {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {},
+            "clientInfo": {
+                "name": "claude-ai",
+                "version": "0.1.0"
+            }
+        },
+        "id": request_id
+    }
+
+def tools_list_request(request_id: Any) -> Dict[str, Any]:
+    """Build a tools/list request."""
+    return {
+        "jsonrpc": "2.0",
+        "method": "tools/list",
+        "params": {},
+        "id": request_id
+    }
+
+def tools_call_request(request_id: Any, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a tools/call request in the MCP format Claude Desktop uses."""
+    return {
+        "jsonrpc": "2.0",
+        "method": "tools/call",
+        "params": {
+            "name": name,
+            "arguments": arguments
+        },
+        "id": request_id
+    }
+
+def call_tool_request(request_id: Any, tool: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a request in the server's legacy call_tool format."""
+    return {
+        "jsonrpc": "2.0",
+        "method": "call_tool",
+        "params": {
+            "tool": tool,
+            "params": params
+        },
+        "id": request_id
+    }
+
+class ResponseReader:
+    """Read JSON-RPC responses from a stream on a background thread and hand them out by id."""
+
+    def __init__(self, stream: TextIO):
+        self._stream = stream
+        self._responses: Dict[Any, Dict[str, Any]] = {}
+        self._closed = False
+        self._condition = threading.Condition()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self) -> None:
+        for line in self._stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                message = _loads(line)
+            except json.JSONDecodeError:
+                print(f"Received non-JSON line: {line}", file=sys.stderr)
+                continue
+            print(f"Received response: {line}", file=sys.stderr)
+            # A batch is answered with one array holding a response per request.
+            messages = message if isinstance(message, list) else [message]
+            with self._condition:
+                for message in messages:
+                    self._responses[message.get("id")] = message
+                self._condition.notify_all()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def wait_for(self, request_id: Any, timeout: float = RESPONSE_TIMEOUT_SECONDS) -> Dict[str, Any]:
+        """
+        Block until the response with the given id arrives.
+
+        Raises:
+            TimeoutError: If no response arrives within timeout seconds
+            EOFError: If the stream closes before the response arrives
+        """
+        return self.wait_for_any([request_id], timeout)
+
+    def wait_for_any(self, request_ids: List[Any], timeout: float = RESPONSE_TIMEOUT_SECONDS) -> Dict[str, Any]:
+        """Block until a response with any of the given ids arrives and return the first one found."""
+        def arrived():
+            return [i for i in request_ids if i in self._responses]
+
+        with self._condition:
+            if not self._condition.wait_for(lambda: arrived() or self._closed, timeout):
+                raise TimeoutError(f"No response to request {request_ids[0]} within {timeout} seconds")
+            found = arrived()
+            if not found:
+                raise EOFError(f"Server closed the stream before answering request {request_ids[0]}")
+            return self._responses.pop(found[0])
+
+class StdioClient:
+    """
+    Send JSON-RPC requests over one stream and wait for their responses on another.
+
+    Requests are written as bytes: to the binary buffer underneath a text
+    stream such as sys.stdout, or to a binary stream directly.
+    """
+
+    def __init__(self, requests: Union[BinaryIO, TextIO], responses: TextIO):
+        self._requests = getattr(requests, "buffer", requests)
+        self._reader = ResponseReader(responses)
+
+    def send_request(
+        self, request: Dict[str, Any], timeout: float = RESPONSE_TIMEOUT_SECONDS
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Send a request and return its response.
+
+        Notifications (requests without an id) get no response, so None is
+        returned for them as soon as they are written.
+        """
+        return self.send_requests([request], timeout)[0]
+
+    def send_requests(
+        self, requests: List[Dict[str, Any]], timeout: float = RESPONSE_TIMEOUT_SECONDS
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Send several independent requests back to back and return their responses in order.
+
+        All requests are written in one flush before any response is awaited, so
+        the server sees them together instead of one round trip apart. Entries
+        for notifications are None.
+        """
+        lines = []
+        for request in requests:
+            payload = _dumps(request)
+            print(f"Sending request: {payload.decode()}", file=sys.stderr)
+            lines.append(payload + b"\n")
+        self._requests.write(b"".join(lines))
+        self._requests.flush()
+        return [
+            self._reader.wait_for(request["id"], timeout) if "id" in request else None
+            for request in requests
+        ]
+
+    def send_batch(
+        self, requests: List[Dict[str, Any]], timeout: float = RESPONSE_TIMEOUT_SECONDS
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Send requests as one JSON-RPC batch array and return their responses in order.
+
+        A server that rejects batches answers with an error whose id is null; the
+        requests are then resent one by one with send_requests.
+        """
+        payload = _dumps(requests)
+        print(f"Sending batch: {payload.decode()}", file=sys.stderr)
+        self._requests.write(payload + b"\n")
+        self._requests.flush()
+
+        ids = [request["id"] for request in requests if "id" in request]
+        if not ids:
+            return [None] * len(requests)
+        first = self._reader.wait_for_any([ids[0], None], timeout)
+        if first.get("id") is None and "error" in first:
+            print("Server rejected the batch; sending requests one at a time", file=sys.stderr)
+            return self.send_requests(requests, timeout)
+
+        responses = {ids[0]: first}
+        for request_id in ids[1:]:
+            responses[request_id] = self._reader.wait_for(request_id, timeout)
+        return [responses.get(request.get("id")) if "id" in request else None for request in requests]
+
+_stdio_client: Optional[StdioClient] = None
+
+def _get_stdio_client() -> StdioClient:
+    global _stdio_client
+    if _stdio_client is None:
+        _stdio_client = StdioClient(sys.stdout, sys.stdin)
+    return _stdio_client
+
+def send_request(
+    request: Dict[str, Any], timeout: float = RESPONSE_TIMEOUT_SECONDS
+) -> Optional[Dict[str, Any]]:
+    """Send a request on stdout and wait for its response on stdin."""
+    return _get_stdio_client().send_request(request, timeout)
+
+def send_requests(
+    requests: List[Dict[str, Any]], timeout: float = RESPONSE_TIMEOUT_SECONDS
+) -> List[Optional[Dict[str, Any]]]:
+    """Send several independent requests on stdout and wait for all their responses on stdin."""
+    return _get_stdio_client().send_requests(requests, timeout)
+
+def send_batch(
+    requests: List[Dict[str, Any]], timeout: float = RESPONSE_TIMEOUT_SECONDS
+) -> List[Optional[Dict[str, Any]]]:
+    """Send requests as one JSON-RPC batch on stdout and wait for their responses on stdin."""
+    return _get_stdio_client().send_batch(requests, timeout)
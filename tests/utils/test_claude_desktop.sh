@@ -10,9 +10,14 @@ fi
 # Rebuild the Docker image
 docker build -t mcp-bigquery-server .
 
-# Run the Claude Desktop simulator against the Docker container
+# Run the Claude Desktop simulator against the Docker container; the server's
+# responses are fed back to the simulator through a FIFO.
+responses=$(mktemp -u)
+mkfifo "$responses"
+trap 'rm -f "$responses"' EXIT
+
 echo "Running Claude Desktop simulator against MCP BigQuery server..."
-python3 $(dirname "$0")/claude_simulator.py | docker run -i --rm \
+python3 $(dirname "$0")/claude_simulator.py < "$responses" | docker run -i --rm \
   -v $(pwd)/credentials:/credentials \
   -e GOOGLE_APPLICATION_CREDENTIALS=/credentials/service-account-key.json \
-  mcp-bigquery-server --stdio
+  mcp-bigquery-server --stdio > "$responses"